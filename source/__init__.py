@@ -1,12 +1,7 @@
 # Expose core  modules to skills and other programs
+from importlib import import_module
 from os.path import abspath, dirname, join
 
-from source.core import (FallbackSkill, Skill, intent_file_handler,
-                         intent_handler)
-from source.core.context import adds_context, removes_context
-from source.intent_services import AdaptIntent
-# from core.api import Api
-from source.messagebus.message import Message
 from source.util.log import LOG
 
 CORE_ROOT_PATH = abspath(join(dirname(__file__), '..'))
@@ -22,4 +17,25 @@ __all__ = ['CORE_ROOT_PATH',
            'intent_file_handler',
            'AdaptIntent']
 
-LOG.init()  # read log level from config
+# The skill framework is only imported when one of its names is accessed so
+# services that don't run skills (audio, listener...) skip importing it.
+_LAZY_ATTRIBUTES = {
+    'FallbackSkill': 'source.core',
+    'Skill': 'source.core',
+    'intent_file_handler': 'source.core',
+    'intent_handler': 'source.core',
+    'adds_context': 'source.core.context',
+    'removes_context': 'source.core.context',
+    'AdaptIntent': 'source.intent_services',
+    # 'Api': 'source.core.api',
+    'Message': 'source.messagebus.message',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
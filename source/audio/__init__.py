@@ -1 +1 @@
-from .utils import wait_while_speaking, is_speaking, stop_speaking
+from .utils import wait_while_speaking, is_speaking, stop_speaking, track_speech
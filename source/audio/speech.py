@@ -4,7 +4,6 @@ from threading import Lock
 from source.configuration import Configuration
 from source.messagebus.message import Message
 from source.tts import TTSFactory
-from source.tts.mimic3_tts import Mimic3
 from source.util import check_for_signal, create_signal
 from source.util.log import LOG
 from source.util.metrics import Stopwatch
@@ -88,7 +87,7 @@ def _get_mimic_fallback():
         config = Configuration.get().get("audio", {})
         tts_config = config.get("tts", {}).get("mimic3", {})
         lang = config.get("lang", "en-us")
-        tts = Mimic3(lang, tts_config)
+        tts = TTSFactory.get_class("mimic3")(lang, tts_config)
         tts.validator.validate()
         tts.init(bus)
         mimic_fallback_obj = tts
@@ -1,7 +1,49 @@
 import time
+from threading import Event
 
 from source.util.signal import check_for_signal
 
+# Set whenever the audio service reports the end of speech, waiters clear it
+# before sleeping on it. Only used once track_speech() has been called.
+_speech_ended = Event()
+_tracking = False
+# Upper bound for a single wait, the isSpeaking signal stays authoritative
+# in case the end of speech message is missed.
+_TRACKED_POLL_TIMEOUT = 1.0
+_POLL_INTERVAL = 0.1
+
+
+def _handle_speech_ended(message):
+    _speech_ended.set()
+
+
+def track_speech(bus):
+    """Wake up speech waiters on end of speech messages from the bus.
+
+    Without it wait_while_speaking() and stop_speaking() poll the isSpeaking
+    signal at a fixed interval.
+
+    Args:
+        bus: messagebus connection of the current process
+    """
+    global _tracking
+    bus.on("recognizer_loop:audio_output_end", _handle_speech_ended)
+    _tracking = True
+
+
+def _wait_for_speech_end():
+    """Block until the isSpeaking signal is gone."""
+    while is_speaking():
+        if _tracking:
+            _speech_ended.clear()
+            # Check again after clearing to not miss an end that happened
+            # in between
+            if not is_speaking():
+                break
+            _speech_ended.wait(_TRACKED_POLL_TIMEOUT)
+        else:
+            time.sleep(_POLL_INTERVAL)
+
 
 def is_speaking():
     """Determine if Text to Speech is occurring
@@ -20,8 +62,7 @@ def wait_while_speaking():
     begin.
     """
     time.sleep(0.3)  # Wait briefly in for any queued speech to begin
-    while is_speaking():
-        time.sleep(0.1)
+    _wait_for_speech_end()
 
 
 def stop_speaking():
@@ -35,5 +76,4 @@ def stop_speaking():
         send("core.audio.speech.stop")
 
         # Block until stopped
-        while check_for_signal("isSpeaking", -1):
-            time.sleep(0.25)
+        _wait_for_speech_end()
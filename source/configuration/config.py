@@ -1,5 +1,8 @@
 import json
 import os
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from os.path import dirname, exists, isfile, join
 
 import xdg.BaseDirectory
@@ -33,8 +36,7 @@ class LocalConf(dict):
         if exists(path) and isfile(path):
             try:
                 config = load_commented_json(path)
-                for key in config:
-                    self.__setitem__(key, config[key])
+                self.update(config)
 
                 # LOG.debug("Configuration {} loaded".format(path))
             except Exception as e:
@@ -156,48 +158,76 @@ class Configuration:
             (dict) merged dict of all configuration files
         """
         if not configs:
-            configs = []
+            # Callers may modify their config, don't hand out the cached dict
+            return deepcopy(Configuration._load_stack(Configuration._stack_stat()))
 
-            # First use the patched config
-            configs.append(Configuration.__patch)
+        # Handle strings in stack
+        for index, item in enumerate(configs):
+            if isinstance(item, str):
+                configs[index] = LocalConf(item)
 
-            # Then use XDG config
-            # This includes both the user config and
-            # /etc/xdg/core/core.conf
-            for conf_dir in xdg.BaseDirectory.load_config_paths("core"):
-                configs.append(LocalConf(join(conf_dir, "core.conf")))
+        # Merge all configs into one
+        base = {}
+        for c in configs:
+            merge_dict(base, c)
+        return base
 
-            # Then use the system config (/etc/core/core.conf)
-            configs.append(LocalConf(SYSTEM_CONFIG))
+    @staticmethod
+    def _stack_stat():
+        """Get the files making up the default stack with their mtimes.
 
-            # Then use remote config
-            # if remote:
-            #     configs.append(RemoteConf())
+        Returns:
+            (tuple) (path, mtime_ns) pairs in order of priority, mtime is None
+            for files that don't exist.
+        """
+        # XDG config includes both the user config and
+        # /etc/xdg/core/core.conf, then comes the system config
+        # (/etc/core/core.conf) and the config that comes with the package
+        paths = [
+            join(conf_dir, "core.conf")
+            for conf_dir in xdg.BaseDirectory.load_config_paths("core")
+        ]
+        paths += [SYSTEM_CONFIG, DEFAULT_CONFIG]
+
+        stat = []
+        for path in paths:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            stat.append((path, mtime))
+        return tuple(stat)
 
-            # Then use the config that comes with the package
-            configs.append(LocalConf(DEFAULT_CONFIG))
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _load_stack(stack_stat):
+        """Load and merge the default config stack.
 
-            # Make sure we reverse the array, as merge_dict will put every new
-            # file on top of the previous one
-            configs = reversed(configs)
-        else:
-            # Handle strings in stack
-            for index, item in enumerate(configs):
-                if isinstance(item, str):
-                    configs[index] = LocalConf(item)
+        The result is cached on the mtimes of the files in the stack so the
+        files are only parsed again when one of them has been modified.
+        Cleared when the config is patched or reported as updated.
 
-        # Merge all configs into one
+        Args:
+            stack_stat (tuple): result of _stack_stat()
+        Returns:
+            (dict) merged dict of all configuration files
+        """
+        # First use the patched config, then the files
+        configs = [Configuration.__patch]
+        # The files are independent until merged, read them concurrently
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            configs += executor.map(LocalConf,
+                                    [path for path, _ in stack_stat])
+
+        # Then use remote config
+        # if remote:
+        #     configs.append(RemoteConf())
+
+        # Make sure we reverse the array, as merge_dict will put every new
+        # file on top of the previous one
         base = {}
-        for c in configs:
+        for c in reversed(configs):
             merge_dict(base, c)
-
-        # copy into cache
-        # if cache:
-        #     Configuration.__config.clear()
-        #     for key in base:
-        #         Configuration.__config[key] = base[key]
-        #     return Configuration.__config
-        # else:
         return base
 
     @staticmethod
@@ -217,6 +247,7 @@ class Configuration:
 
         Triggers an update of cached config.
         """
+        Configuration._load_stack.cache_clear()
         Configuration.load_config_stack(cache=True)
 
     @staticmethod
@@ -229,6 +260,7 @@ class Configuration:
         """
         config = message.data.get("config", {})
         merge_dict(Configuration.__patch, config)
+        Configuration._load_stack.cache_clear()
         Configuration.load_config_stack(cache=True)
 
     @staticmethod
@@ -240,4 +272,5 @@ class Configuration:
                      in the data payload.
         """
         Configuration.__patch = {}
+        Configuration._load_stack.cache_clear()
         Configuration.load_config_stack(cache=True)
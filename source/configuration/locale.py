@@ -5,6 +5,8 @@ lingua-franca (https://github.com/mycroftai/lingua-franca) selected language
 
 # from lingua_franca import set_default_lang as _set_default_lf_lang
 
+DEFAULT_LF_LANG = "en-us"
+
 
 def set_default_lf_lang(lang_code="en-us"):
     """Set the default language of Lingua Franca for parsing and formatting.
@@ -17,4 +19,4 @@ def set_default_lf_lang(lang_code="en-us"):
         lang (str): BCP-47 language code, e.g. "en-us" or "es-mx"
     """
     # return _set_default_lf_lang(lang_code=lang_code)
-    return "en-us"
+    return DEFAULT_LF_LANG
@@ -11,7 +11,7 @@ import time
 # from lingua_franca import load_languages
 
 import source.lock
-from source.audio import wait_while_speaking
+from source.audio import track_speech, wait_while_speaking
 from source.core.api import SkillApi
 from source.core.event_scheduler import EventScheduler
 from source.core.fallback_skill import FallbackSkill
@@ -72,6 +72,7 @@ def main(
 
     # Connect this process to the Core message bus
     bus = start_message_bus_client("CORE")
+    track_speech(bus)
     _register_intent_services(bus)
     event_scheduler = EventScheduler(bus)
     callbacks = StatusCallbackMap(
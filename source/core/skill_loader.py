@@ -3,6 +3,7 @@ import gc
 import importlib
 import os
 import sys
+from inspect import signature
 from time import time
 
 from source.configuration import Configuration
@@ -25,8 +26,9 @@ def remove_submodule_refs(module_name):
     """
     submodules = []
     LOG.debug("Skill module: {}".format(module_name))
-    # Collect found submodules
-    for m in sys.modules:
+    # Collect found submodules, copying the keys as other threads may be
+    # importing while skills are loaded in parallel
+    for m in list(sys.modules):
         if m.startswith(module_name + "."):
             submodules.append(m)
     # Remove all references them to in sys.modules
@@ -69,6 +71,26 @@ def _bad_mod_times(mod_times):
     return [path for path in mod_times if mod_times[path] > current_time]
 
 
+def _is_ignored_for_reload(file_name):
+    """Check if changes to a skill file should not trigger a reload.
+
+    Compiled python files, hidden files and the settings.json file are
+    ignored.
+
+    Args:
+        file_name: name of the file, without directory
+
+    Returns:
+        bool: True if the file is ignored
+    """
+    return (
+        file_name.endswith(".pyc")
+        or file_name == "settings.json"
+        or file_name.startswith(".")
+        or file_name.endswith(".qmlc")
+    )
+
+
 def _get_last_modified_time(path):
     """Get the last modified date of the most recently updated file in a path.
 
@@ -85,13 +107,7 @@ def _get_last_modified_time(path):
     for root_dir, dirs, files in os.walk(path):
         dirs[:] = [d for d in dirs if not d.startswith(".")]
         for f in files:
-            ignore_file = (
-                f.endswith(".pyc")
-                or f == "settings.json"
-                or f.startswith(".")
-                or f.endswith(".qmlc")
-            )
-            if not ignore_file:
+            if not _is_ignored_for_reload(f):
                 all_files.append(os.path.join(root_dir, f))
 
     # check files of interest in the skill root directory
@@ -116,6 +132,7 @@ class SkillLoader:
         self.last_modified = 0
         self.last_loaded = 0
         self.instance = None
+        self._converse_param_count = None
         self.active = True
         self.config = Configuration.get()
 
@@ -130,6 +147,18 @@ class SkillLoader:
         else:
             return False
 
+    @property
+    def converse_param_count(self):
+        """Number of parameters taken by the skill's converse method.
+
+        Inspected once per loaded instance since signature() is slow.
+        """
+        if self._converse_param_count is None:
+            self._converse_param_count = len(
+                signature(self.instance.converse).parameters
+            )
+        return self._converse_param_count
+
     def reload_needed(self):
         """Load an unloaded skill or reload unloaded/changed skill.
 
@@ -234,6 +263,7 @@ class SkillLoader:
         self.load_attempted = True
         self.loaded = False
         self.instance = None
+        self._converse_param_count = None
 
     def _skip_load(self):
         log_msg = "Skill {} is blacklisted - it will not be loaded"
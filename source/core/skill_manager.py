@@ -14,10 +14,13 @@
 #
 """"Load, update and manage skills on this device."""
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from glob import glob
-from inspect import signature
 from threading import Event, Lock, Thread
-from time import monotonic, sleep
+from time import monotonic
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 
 from source import Message
 from source.configuration import Configuration
@@ -26,9 +29,11 @@ from source.messagebus.client import MessageBusClient
 from source.util.file_utils import FileWatcher
 from source.util.log import LOG
 
-from .skill_loader import SkillLoader
+from .skill_loader import SkillLoader, _is_ignored_for_reload
 
 SKILL_MAIN_MODULE = "__init__.py"
+SKILL_SHUTDOWN_TIMEOUT = 5  # seconds to wait for all skills to shut down
+UPLOAD_QUEUE_SHARDS = 8
 
 
 class UploadQueue:
@@ -40,12 +45,16 @@ class UploadQueue:
 
     After all queued settingsmeta has been processed and the queue is empty
     the queue will set the self.started flag.
+
+    The queue is split in shards, each with its own lock, so skills loaded in
+    parallel rarely contend when adding themselves.
     """
 
     def __init__(self):
-        self._queue = []
+        # loaders keyed by id, in insertion order within each shard
+        self._shards = [{} for _ in range(UPLOAD_QUEUE_SHARDS)]
+        self._locks = [Lock() for _ in range(UPLOAD_QUEUE_SHARDS)]
         self.started = False
-        self.lock = Lock()
 
     def start(self):
         """Start processing of the queue."""
@@ -57,20 +66,29 @@ class UploadQueue:
         self.started = False
 
     def send(self):
-        """Loop through all stored loaders triggering settingsmeta upload."""
-        with self.lock:
-            queue = self._queue
-            self._queue = []
+        """Trigger settingsmeta upload for all stored loaders.
+
+        The uploads are independent network requests so they are run
+        concurrently.
+        """
+        queue = {}
+        for index, lock in enumerate(self._locks):
+            with lock:
+                shard = self._shards[index]
+                self._shards[index] = {}
+            queue.update(shard)
         if queue:
             LOG.info("New Settings meta to upload.")
-            for loader in queue:
-                if self.started:
-                    loader.instance.settings_meta.upload()
-                else:
-                    break
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                # consume the results to raise any upload error
+                list(executor.map(self._upload, queue.values()))
+
+    def _upload(self, loader):
+        if self.started:
+            loader.instance.settings_meta.upload()
 
     def __len__(self):
-        return len(self._queue)
+        return sum(len(shard) for shard in self._shards)
 
     def put(self, loader):
         """Append a skill loader to the queue.
@@ -79,10 +97,71 @@ class UploadQueue:
         """
         if self.started:
             LOG.info("Updating settings meta during runtime...")
-        with self.lock:
-            # Remove existing loader
-            self._queue = [e for e in self._queue if e != loader]
-            self._queue.append(loader)
+        key = id(loader)
+        # object ids are aligned, hash them as a tuple to mix the low bits
+        index = hash((key,)) % UPLOAD_QUEUE_SHARDS
+        with self._locks[index]:
+            shard = self._shards[index]
+            # Remove existing loader so the new entry goes last
+            shard.pop(key, None)
+            shard[key] = loader
+
+
+class SkillDirectoryEventHandler(FileSystemEventHandler):
+    """Track skills coming, going and changing in the skills directory.
+
+    The skill directory listing is flagged as stale on creation, deletion and
+    moves of the immediate children of the skills directory, or of their main
+    module. Changes to the other files of a skill are reported per skill.
+    """
+
+    _events = ("created", "deleted", "moved")
+    _file_events = ("created", "deleted", "moved", "modified")
+
+    def __init__(self, skills_dir, stale_event, on_skill_changed=None):
+        """
+        Args:
+            skills_dir (str): directory holding the skills
+            stale_event (Event): set when skills were added or removed
+            on_skill_changed (callable): called with the skill directory when
+                                         a file of that skill changed
+        """
+        super().__init__()
+        self._skills_dir = os.path.normpath(skills_dir)
+        self._stale = stale_event
+        self._on_skill_changed = on_skill_changed
+
+    def _is_relevant(self, path):
+        parent = os.path.dirname(path)
+        if parent == self._skills_dir:
+            return True
+        return (
+            os.path.basename(path) == SKILL_MAIN_MODULE
+            and os.path.dirname(parent) == self._skills_dir
+        )
+
+    def _changed_skill(self, path):
+        """Get the skill directory a changed file belongs to, if relevant."""
+        parts = os.path.relpath(path, self._skills_dir).split(os.sep)
+        if len(parts) < 2 or parts[0] == os.pardir:
+            return None
+        hidden_dir = any(part.startswith(".") for part in parts[1:-1])
+        if hidden_dir or _is_ignored_for_reload(parts[-1]):
+            return None
+        return os.path.join(self._skills_dir, parts[0])
+
+    def on_any_event(self, event):
+        paths = [p for p in (event.src_path, getattr(event, "dest_path", "")) if p]
+        if event.event_type in self._events and any(map(self._is_relevant, paths)):
+            self._stale.set()
+
+        if self._on_skill_changed is None or event.event_type not in self._file_events:
+            return
+        if event.is_directory and event.event_type in ("created", "modified"):
+            return
+        for skill_dir in {self._changed_skill(path) for path in paths}:
+            if skill_dir is not None:
+                self._on_skill_changed(skill_dir)
 
 
 def _shutdown_skill(instance):
@@ -141,10 +220,20 @@ class SkillManager(Thread):
 
         self.skills_dir_path = self.config.get("skills").get("directory")
         self.skill_loaders = {}
+        self._loaders_by_id = {}  # skill_loaders indexed by skill_id
         self.plugin_skills = {}
-        self.initial_load_complete = False
+        self._skill_list_cache = None  # skillmanager.list reply data
+        self._initial_training = Event()
         self.num_install_retries = 0
         self.empty_skill_dirs = set()  # Save a record of empty skill dirs.
+        self.skill_directories = []
+        # Set whenever the skill directories on disk may have changed
+        self._skill_dirs_stale = Event()
+        self._skill_dirs_stale.set()
+        self._skill_dir_observer = None
+        # Skills with files changed since the last reload check
+        self._dirty_skills = set()
+        self._dirty_skills_lock = Lock()
 
         self._define_message_bus_events()
         self.daemon = True
@@ -162,10 +251,32 @@ class SkillManager(Thread):
             recursive=True,
             ignore_creation=True,
         )
+        # track skills being added or removed instead of rescanning each loop
+        if os.path.isdir(self.skills_dir_path):
+            self._skill_dir_observer = Observer()
+            self._skill_dir_observer.schedule(
+                SkillDirectoryEventHandler(
+                    self.skills_dir_path,
+                    self._skill_dirs_stale,
+                    self._mark_skill_dirty,
+                ),
+                self.skills_dir_path,
+                recursive=True,
+            )
+            self._skill_dir_observer.start()
+        else:
+            LOG.warning(
+                f"{self.skills_dir_path} does not exist, "
+                "polling for skills instead"
+            )
+
+    def _mark_skill_dirty(self, skill_dir):
+        with self._dirty_skills_lock:
+            self._dirty_skills.add(skill_dir)
 
     def _handle_settings_file_change(self, path: str):
-        if path.endswith("/settings.json"):
-            skill_id = path.split("/")[-2]
+        if os.path.basename(path) == "settings.json":
+            skill_id = os.path.basename(os.path.dirname(path))
             LOG.info(f"skill settings.json change detected for {skill_id}")
             self.bus.emit(
                 Message("core.skills.settings_changed", {"skill_id": skill_id})
@@ -197,7 +308,7 @@ class SkillManager(Thread):
                 ready = self.is_device_ready()
             except TimeoutError:
                 LOG.warning("System should already have reported ready!")
-                sleep(5)
+                self._stop_event.wait(5)
 
         LOG.info("System is all loaded and ready to roll!")
         self.bus.emit(message.reply("core.ready"))
@@ -222,7 +333,7 @@ class SkillManager(Thread):
                     f"Timeout waiting for services start. services={services}"
                 )
             else:
-                sleep(3)
+                self._stop_event.wait(3)
         return is_ready
 
     # NOTE: There might be an error from here on what config file is being accessed
@@ -244,8 +355,12 @@ class SkillManager(Thread):
             bus = self.bus
         return bus
 
+    @property
+    def initial_load_complete(self):
+        return self._initial_training.is_set()
+
     def handle_initial_training(self, message):
-        self.initial_load_complete = True
+        self._initial_training.set()
 
     def run(self):
         """Load skills and update periodically from disk and internet."""
@@ -256,8 +371,9 @@ class SkillManager(Thread):
 
         # wait for initial intents training
         LOG.debug("Waiting for initial training")
-        while not self.initial_load_complete:
-            sleep(0.5)
+        while not self._initial_training.wait(timeout=5):
+            if self._stop_event.is_set():
+                return
 
         if not self._connected_event.is_set():
             LOG.info("Offline Skills loaded, waiting for Internet to load more!")
@@ -266,41 +382,72 @@ class SkillManager(Thread):
         # unload the existing version from memory and reload from the disk.
         while not self._stop_event.is_set():
             try:
-                self._unload_removed_skills()
-                self._reload_modified_skills()
-                self._load_new_skills()
+                skill_dirs = self._get_skill_directories()
+                self._unload_removed_skills(skill_dirs)
+                self._reload_modified_skills(skill_dirs)
+                self._load_new_skills(skill_dirs)
                 self._watchdog()
-                sleep(2)  # Pause briefly before beginning next scan
+                # Pause briefly before beginning next scan
+                self._stop_event.wait(2)
             except Exception:
                 LOG.exception(
                     "Something really unexpected has occurred "
                     "and the skill manager loop safety harness was "
                     "hit."
                 )
-                sleep(30)
+                self._stop_event.wait(30)
 
     def _remove_git_locks(self):
         """If git gets killed from an abrupt shutdown it leaves lock files."""
 
-        lock_path = os.path.join(self.skills_dir_path, "/.git/index.lock")
+        lock_path = os.path.join(self.skills_dir_path, "*", ".git", "index.lock")
         for i in glob(lock_path):
             LOG.warning("Found and removed git lock file: " + i)
             os.remove(i)
 
     def _load_on_startup(self):
-        """Handle initial skill load."""
-        self._load_new_skills()
+        """Handle initial skill load.
+
+        The skills are independent of each other, so they are loaded in a
+        thread pool to cut down startup time.
+        """
+        skill_dirs = [
+            skill_dir
+            for skill_dir in self._get_skill_directories()
+            if skill_dir not in self.skill_loaders
+        ]
+        if skill_dirs:
+            with ThreadPoolExecutor(max_workers=min(8, len(skill_dirs))) as executor:
+                loaders = list(executor.map(self._load_skill, skill_dirs))
+            for loader in loaders:
+                if loader:
+                    self.upload_queue.put(loader)
+        self._alive_status = True
         self.bus.emit(Message("core.skills.initialized"))
         self._loaded_status = True
 
-    def _reload_modified_skills(self):
-        """Handle reload of recently changed skill(s)"""
-        for skill_dir in self._get_skill_directories():
+    def _reload_modified_skills(self, skill_dirs=None):
+        """Handle reload of recently changed skill(s)
+
+        Args:
+            skill_dirs (list): skill directories, scanned if not provided
+        """
+        if skill_dirs is None:
+            skill_dirs = self._get_skill_directories()
+        if self._skill_dir_observer is not None:
+            # Only check the skills the watcher saw files change in
+            with self._dirty_skills_lock:
+                dirty_skills = self._dirty_skills
+                self._dirty_skills = set()
+            skill_dirs = [d for d in skill_dirs if d in dirty_skills]
+        for skill_dir in skill_dirs:
             try:
                 skill_loader = self.skill_loaders.get(skill_dir)
                 if skill_loader is not None and skill_loader.reload_needed():
+                    reloaded = skill_loader.reload()
+                    self._skill_list_cache = None
                     # If reload succeed add settingsmeta to upload queue
-                    if skill_loader.reload():
+                    if reloaded:
                         self.upload_queue.put(skill_loader)
             except Exception:
                 LOG.exception(
@@ -308,9 +455,15 @@ class SkillManager(Thread):
                     "reloading {}".format(skill_dir)
                 )
 
-    def _load_new_skills(self):
-        """Handle load of skills installed since startup."""
-        for skill_dir in self._get_skill_directories():
+    def _load_new_skills(self, skill_dirs=None):
+        """Handle load of skills installed since startup.
+
+        Args:
+            skill_dirs (list): skill directories, scanned if not provided
+        """
+        if skill_dirs is None:
+            skill_dirs = self._get_skill_directories()
+        for skill_dir in skill_dirs:
             if skill_dir not in self.skill_loaders:
                 loader = self._load_skill(skill_dir)
                 if loader:
@@ -331,51 +484,81 @@ class SkillManager(Thread):
             LOG.exception(f"Load of skill {skill_directory} failed!")
             load_status = False
         finally:
-            self.skill_loaders[skill_directory] = skill_loader
+            with self._lock:
+                self.skill_loaders[skill_directory] = skill_loader
+                self._loaders_by_id[skill_loader.skill_id] = skill_loader
+                self._skill_list_cache = None
 
         return skill_loader if load_status else None
 
     def _unload_skill(self, skill_dir):
-        if skill_dir in self.skill_loaders:
-            skill = self.skill_loaders[skill_dir]
+        skill = self.skill_loaders.get(skill_dir)
+        if skill is not None:
             LOG.info(f"removing {skill.skill_id}")
             try:
                 skill.unload()
             except Exception:
-                LOG.exception("Failed to shutdown skill " + skill.id)
-            del self.skill_loaders[skill_dir]
+                LOG.exception("Failed to shutdown skill " + skill.skill_id)
+            with self._lock:
+                self.skill_loaders.pop(skill_dir, None)
+                self._loaders_by_id.pop(skill.skill_id, None)
+                self._skill_list_cache = None
 
     def _get_skill_directories(self):
-        skill_glob = glob(os.path.join(self.skills_dir_path, "*/"))
+        """Get the directories containing a skill.
+
+        The directories are only scanned again after the skill directory
+        watcher reported a change, or on every call if it isn't running.
+        """
+        if self._skill_dirs_stale.is_set() or self._skill_dir_observer is None:
+            # Clear first so changes made during the scan trigger a new one
+            self._skill_dirs_stale.clear()
+            self.skill_directories = self._scan_skill_directories()
+        return list(self.skill_directories)
 
+    def _scan_skill_directories(self):
         skill_directories = []
-        for skill_dir in skill_glob:
+        try:
+            entries = list(os.scandir(self.skills_dir_path))
+        except FileNotFoundError:
+            return skill_directories
+
+        for entry in entries:
+            # Match the old glob("*/"): visible directories, symlinks allowed
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            skill_dir = entry.path
             # TODO: all python packages must have __init__.py!  Better way?
             # check if folder is a skill (must have __init__.py)
-            if SKILL_MAIN_MODULE in os.listdir(skill_dir):
-                skill_directories.append(skill_dir.rstrip("/"))
-                if skill_dir in self.empty_skill_dirs:
-                    self.empty_skill_dirs.discard(skill_dir)
-            else:
-                if skill_dir not in self.empty_skill_dirs:
-                    self.empty_skill_dirs.add(skill_dir)
-                    LOG.debug("Found skills directory with no skill: " + skill_dir)
+            if os.path.exists(os.path.join(skill_dir, SKILL_MAIN_MODULE)):
+                skill_directories.append(skill_dir)
+                self.empty_skill_dirs.discard(skill_dir)
+            elif skill_dir not in self.empty_skill_dirs:
+                # Only log the first time the empty directory is seen
+                self.empty_skill_dirs.add(skill_dir)
+                LOG.debug("Found skills directory with no skill: " + skill_dir)
 
         return skill_directories
 
-    def _unload_removed_skills(self):
-        """Shutdown removed skills."""
-        skill_dirs = self._get_skill_directories()
+    def _unload_removed_skills(self, skill_dirs=None):
+        """Shutdown removed skills.
+
+        Args:
+            skill_dirs (list): skill directories, scanned if not provided
+        """
+        if skill_dirs is None:
+            skill_dirs = self._get_skill_directories()
         # Find loaded skills that don't exist on disk
+        skill_dirs = set(skill_dirs)
         removed_skills = [s for s in self.skill_loaders.keys() if s not in skill_dirs]
-        for skill_dir in removed_skills:
-            skill = self.skill_loaders[skill_dir]
-            LOG.info("removing {}".format(skill.skill_id))
-            try:
-                skill.unload()
-            except Exception:
-                LOG.exception("Failed to shutdown skill " + skill.id)
-            del self.skill_loaders[skill_dir]
+        if len(removed_skills) > 1:
+            # Tear down several removed skills at once
+            workers = min(8, len(removed_skills))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._unload_skill, removed_skills))
+        else:
+            for skill_dir in removed_skills:
+                self._unload_skill(skill_dir)
 
     def is_alive(self, message=None):
         """Respond to is_alive status request."""
@@ -385,15 +568,32 @@ class SkillManager(Thread):
         """Respond to all_loaded status request."""
         return self._loaded_status
 
+    def _get_loader(self, skill_id):
+        """Get the loader of a skill or plugin skill by skill_id."""
+        skill_loader = self._loaders_by_id.get(skill_id)
+        if skill_loader is None:
+            for skill_loader in self.plugin_skills.values():
+                if skill_loader.skill_id == skill_id:
+                    return skill_loader
+            return None
+        return skill_loader
+
     def send_skill_list(self, _):
-        """Send list of loaded skills."""
+        """Send list of loaded skills.
+
+        The list is cached until a skill is loaded, unloaded, activated or
+        deactivated.
+        """
         try:
-            message_data = {}
-            for skill_dir, skill_loader in self.skill_loaders.items():
-                message_data[skill_loader.skill_id] = dict(
-                    active=skill_loader.active and skill_loader.loaded,
-                    id=skill_loader.skill_id,
-                )
+            message_data = self._skill_list_cache
+            if message_data is None:
+                message_data = {}
+                for skill_dir, skill_loader in self.skill_loaders.items():
+                    message_data[skill_loader.skill_id] = dict(
+                        active=skill_loader.active and skill_loader.loaded,
+                        id=skill_loader.skill_id,
+                    )
+                self._skill_list_cache = message_data
             self.bus.emit(Message("core.skills.list", data=message_data))
         except Exception:
             LOG.exception("Failed to send skill list")
@@ -401,11 +601,11 @@ class SkillManager(Thread):
     def deactivate_skill(self, message):
         """Deactivate a skill."""
         try:
-            skills = {**self.skill_loaders, **self.plugin_skills}
-            for skill_loader in skills.values():
-                if message.data["skill"] == skill_loader.skill_id:
-                    LOG.info("Deactivating skill: " + skill_loader.skill_id)
-                    skill_loader.deactivate()
+            skill_loader = self._get_loader(message.data["skill"])
+            if skill_loader is not None:
+                LOG.info("Deactivating skill: " + skill_loader.skill_id)
+                skill_loader.deactivate()
+                self._skill_list_cache = None
         except Exception:
             LOG.exception("Failed to deactivate " + message.data["skill"])
 
@@ -414,13 +614,11 @@ class SkillManager(Thread):
         try:
             skill_to_keep = message.data["skill"]
             LOG.info("Deactivating all skills except {}".format(skill_to_keep))
-            loaded_skill_file_names = [
-                os.path.basename(skill_dir) for skill_dir in self.skill_loaders
-            ]
-            if skill_to_keep in loaded_skill_file_names:
-                for skill in self.skill_loaders.values():
-                    if skill.skill_id != skill_to_keep:
+            if skill_to_keep in self._loaders_by_id:
+                for skill_id, skill in self._loaders_by_id.items():
+                    if skill_id != skill_to_keep:
                         skill.deactivate()
+                self._skill_list_cache = None
             else:
                 LOG.info("Couldn't find skill " + message.data["skill"])
         except Exception:
@@ -429,12 +627,15 @@ class SkillManager(Thread):
     def activate_skill(self, message):
         """Activate a deactivated skill."""
         try:
-            for skill_loader in self.skill_loaders.values():
-                if (
-                    message.data["skill"] in ("all", skill_loader.skill_id)
-                    and not skill_loader.active
-                ):
+            skill_id = message.data["skill"]
+            if skill_id == "all":
+                skill_loaders = list(self.skill_loaders.values())
+            else:
+                skill_loaders = [self._loaders_by_id.get(skill_id)]
+            for skill_loader in skill_loaders:
+                if skill_loader is not None and not skill_loader.active:
                     skill_loader.activate()
+                    self._skill_list_cache = None
         except Exception:
             LOG.exception("Couldn't activate skill")
 
@@ -443,13 +644,29 @@ class SkillManager(Thread):
         # self.status.set_stopping()
         self._stop_event.set()
 
-        # Do a clean shutdown of all skills
-        for skill_loader in self.skill_loaders.values():
-            if skill_loader.instance is not None:
-                _shutdown_skill(skill_loader.instance)
+        # Do a clean shutdown of all skills, in parallel so a slow skill
+        # doesn't hold up the others
+        instances = [
+            skill_loader.instance
+            for skill_loader in self.skill_loaders.values()
+            if skill_loader.instance is not None
+        ]
+        if instances:
+            executor = ThreadPoolExecutor(max_workers=min(8, len(instances)))
+            futures = {
+                executor.submit(_shutdown_skill, instance): instance
+                for instance in instances
+            }
+            _, not_done = wait(futures, timeout=SKILL_SHUTDOWN_TIMEOUT)
+            for future in not_done:
+                LOG.warning(f"{futures[future].skill_id} did not shut down in time")
+            executor.shutdown(wait=False)
 
         if self._settings_watchdog:
             self._settings_watchdog.shutdown()
+        if self._skill_dir_observer:
+            self._skill_dir_observer.unschedule_all()
+            self._skill_dir_observer.stop()
 
     def handle_converse_request(self, message):
         """Check if the targeted skill id can handle conversation
@@ -457,38 +674,31 @@ class SkillManager(Thread):
         If supported, the conversation is invoked.
         """
         skill_id = message.data["skill_id"]
+        skill_loader = self._loaders_by_id.get(skill_id)
 
-        # loop trough skills list and call converse for skill with skill_id
-        skill_found = False
-        for skill_loader in self.skill_loaders.values():
-            if skill_loader.skill_id == skill_id:
-                skill_found = True
-                if not skill_loader.loaded:
-                    error_message = "converse requested but skill not loaded"
-                    self._emit_converse_error(message, skill_id, error_message)
-                    break
-                try:
-                    # check the signature of a converse method
-                    # to either pass a message or not
-                    if len(signature(skill_loader.instance.converse).parameters) == 1:
-                        result = skill_loader.instance.converse(message=message)
-                    else:
-                        utterances = message.data["utterances"]
-                        lang = message.data["lang"]
-                        result = skill_loader.instance.converse(
-                            utterances=utterances, lang=lang
-                        )
-                    self._emit_converse_response(result, message, skill_loader)
-                except Exception:
-                    error_message = "exception in converse method"
-                    LOG.exception(error_message)
-                    self._emit_converse_error(message, skill_id, error_message)
-                finally:
-                    break
-
-        if not skill_found:
+        if skill_loader is None:
             error_message = "skill id does not exist"
             self._emit_converse_error(message, skill_id, error_message)
+        elif not skill_loader.loaded:
+            error_message = "converse requested but skill not loaded"
+            self._emit_converse_error(message, skill_id, error_message)
+        else:
+            try:
+                # check the signature of a converse method
+                # to either pass a message or not
+                if skill_loader.converse_param_count == 1:
+                    result = skill_loader.instance.converse(message=message)
+                else:
+                    utterances = message.data["utterances"]
+                    lang = message.data["lang"]
+                    result = skill_loader.instance.converse(
+                        utterances=utterances, lang=lang
+                    )
+                self._emit_converse_response(result, message, skill_loader)
+            except Exception:
+                error_message = "exception in converse method"
+                LOG.exception(error_message)
+                self._emit_converse_error(message, skill_id, error_message)
 
     def _emit_converse_error(self, message, skill_id, error_msg):
         """Emit a message reporting the error back to the intent service."""
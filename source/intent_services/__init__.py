@@ -1,10 +1,12 @@
 """Intent service, providing intent parsing since forever!"""
 
 import time
-from collections import namedtuple
-from copy import copy
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from langchain.memory import ChatMessageHistory
+from langchain.schema import AIMessage, HumanMessage
 
 from source.api import SystemApi
 from source.audio import wait_while_speaking
@@ -32,6 +34,16 @@ IntentMatch = namedtuple(
 )
 
 
+@lru_cache(maxsize=1)
+def _default_lang():
+    """Get the configured default language in lower case.
+
+    Cached since it's needed for every utterance, cleared by the intent
+    service when the configuration changes.
+    """
+    return Configuration.get().get("lang", "en-us").lower()
+
+
 def _get_message_lang(message):
     """Get the language from the message or the default language.
 
@@ -41,8 +53,8 @@ def _get_message_lang(message):
     Returns:
         The languge code from the message or the default language.
     """
-    default_lang = Configuration.get().get("lang", "en-us")
-    return message.data.get("lang", default_lang).lower()
+    lang = message.data.get("lang")
+    return lang.lower() if lang else _default_lang()
 
 
 class IntentService:
@@ -81,6 +93,37 @@ class IntentService:
         self.fallback = FallbackService(bus)
         self.api = SystemApi()
 
+        # Matchers used for utterances, listed in priority order.
+        self._padatious_matcher = PadatiousMatcher(
+            getattr(self, "padatious_service", None)
+        )
+        # Padatious matching has no side effects so it can run in the
+        # background while the matchers before it are tried
+        self._match_executor = None
+        if config.get("padatious", {}).get("parallel_matching", False):
+            self._match_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="intent-match"
+            )
+        self._match_funcs = (
+            self._converse,
+            self._padatious_matcher.match_high,
+            self.adapt_service.match_intent,
+            self.persona.match,
+            self.fallback.high_prio,
+            self._padatious_matcher.match_medium,
+            self.fallback.medium_prio,
+            self._padatious_matcher.match_low,
+            self.fallback.low_prio,
+        )
+        # TODO once we have a mechanism for checking if a fallback will
+        #  trigger without actually triggering it, those should be added here
+        self._intent_match_funcs = (
+            self._padatious_matcher.match_high,
+            self.adapt_service.match_intent,
+            self._padatious_matcher.match_medium,
+            self._padatious_matcher.match_low,
+        )
+
         self.bus.on("register_vocab", self.handle_register_vocab)
         self.bus.on("register_intent", self.handle_register_intent)
         self.bus.on("recognizer_loop:utterance", self.handle_utterance)
@@ -98,6 +141,12 @@ class IntentService:
         self.bus.on("core.skills.loaded", self.update_skill_name_dict)
         self.bus.on("intent.service.response.latency", self.handle_response_latency)
         self.bus.on("core.api.generate", self.handle_generate)
+        for msg_type in (
+            "configuration.updated",
+            "configuration.patch",
+            "configuration.patch.clear",
+        ):
+            self.bus.on(msg_type, self.handle_configuration_changed)
 
         # def add_active_skill_handler(message):
         #     skill_id = message.data["skill_id"]
@@ -112,14 +161,18 @@ class IntentService:
         # self.bus.on("active_skill_request", add_active_skill_handler)
         # self.bus.on("remove_active_skill", remove_active_skill_handler)
 
-        self.active_skills = []  # [skill_id , timestamp]
+        # skill_id: timestamp, most recently active first
+        self.active_skills = OrderedDict()
         # HACK: set to 0.5 for qa to not loop for a long time and let padatious handle
         # intent
         self.converse_timeout = 10  # minutes to prune active_skills
+        self._current_lang = None  # last language set for Lingua Franca
 
         # Intents API
         self.registered_vocab = []
+        self._adapt_manifest = None  # built on request, reset on changes
         self.bus.on("intent.service.intent.get", self.handle_get_intent)
+        self.bus.on("intent.service.intent.batch.get", self.handle_get_intent_batch)
         self.bus.on("intent.service.skills.get", self.handle_get_skills)
         self.bus.on("intent.service.active_skills.get", self.handle_get_active_skills)
         self.bus.on("intent.service.adapt.get", self.handle_get_adapt)
@@ -136,9 +189,19 @@ class IntentService:
             self.handle_entity_manifest,
         )
 
+    def handle_configuration_changed(self, _):
+        """Drop configuration values cached for the utterance handling."""
+        _default_lang.cache_clear()
+
     @property
     def registered_intents(self):
-        return [parser.__dict__ for parser in self.adapt_service.engine.intent_parsers]
+        """Copies of the registered adapt intent parsers' attributes."""
+        if self._adapt_manifest is None:
+            self._adapt_manifest = [
+                vars(parser).copy()
+                for parser in self.adapt_service.engine.intent_parsers
+            ]
+        return list(self._adapt_manifest)
 
     def stop_system_speech(self, event):
         """Stop speech when wakeword is called to handle new utterance"""
@@ -168,12 +231,22 @@ class IntentService:
         """
         return self.skill_names.get(skill_id, skill_id)
 
+    def _set_default_lang(self, lang):
+        """Set the Lingua Franca default language if it changed.
+
+        Args:
+            lang (str): language of the current interaction
+        """
+        if lang != self._current_lang:
+            set_default_lf_lang(lang)
+            self._current_lang = lang
+
     def reset_converse(self, message):
         """Let skills know there was a problem with speech recognition"""
         lang = _get_message_lang(message)
-        set_default_lf_lang(lang)
-        for skill in copy(self.active_skills):
-            self.do_converse(None, skill[0], lang, message)
+        self._set_default_lang(lang)
+        for skill_id in tuple(self.active_skills):
+            self.do_converse(None, skill_id, lang, message)
 
     def do_converse(self, utterances, skill_id, lang, message):
         """Call skill and ask if they want to process the utterance.
@@ -189,7 +262,20 @@ class IntentService:
             "skill.converse.request",
             {"skill_id": skill_id, "utterances": utterances, "lang": lang},
         )
-        result = self.bus.wait_for_response(converse_msg, "skill.converse.response")
+        timeout = 3.0
+        deadline = time.monotonic() + timeout
+        result = self.bus.wait_for_response(
+            converse_msg, "skill.converse.response", timeout
+        )
+        while result is not None and result.data.get("skill_id", skill_id) != skill_id:
+            # A late answer from a skill asked earlier, keep waiting for the
+            # queried skill until the original timeout
+            LOG.debug(f"Ignoring converse response for {result.data['skill_id']}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                result = None
+                break
+            result = self.bus.wait_for_message("skill.converse.response", remaining)
         if result and "error" in result.data:
             self.handle_converse_error(result)
             ret = False
@@ -217,25 +303,21 @@ class IntentService:
         Args:
             skill_id (str): skill to remove
         """
-        for skill in self.active_skills:
-            if skill[0] == skill_id:
-                self.active_skills.remove(skill)
+        self.active_skills.pop(skill_id, None)
 
     def add_active_skill(self, skill_id):
         """Add a skill or update the position of an active skill.
 
         The skill is added to the front of the list, if it's already in the
-        list it's removed so there is only a single entry of it.
+        list it's moved there so there is only a single entry of it.
 
         Args:
             skill_id (str): identifier of skill to be added.
         """
-        # search the list for an existing entry that already contains it
-        # and remove that reference
         if skill_id != "":
-            self.remove_active_skill(skill_id)
             # add skill with timestamp to start of skill_list
-            self.active_skills.insert(0, [skill_id, time.time()])
+            self.active_skills[skill_id] = time.time()
+            self.active_skills.move_to_end(skill_id, last=False)
         else:
             LOG.warning("Skill ID was empty, won't add to list of " "active skills.")
 
@@ -252,17 +334,16 @@ class IntentService:
         """Handle context from UI. For every switch to a new chat, the context
         changes. And used for the next llm response
         """
-        chat_memory = ChatMessageHistory()
-
         context_data = message.data.get("utterance_context", {})
 
-        for data in context_data:
-            if data["role"] == "user":
-                if data["content"]:
-                    chat_memory.add_user_message(message=data["content"])
-            else:
-                if data["content"]:
-                    chat_memory.add_ai_message(message=data["content"])
+        messages = [
+            (HumanMessage if data["role"] == "user" else AIMessage)(
+                content=data["content"]
+            )
+            for data in context_data
+            if data["content"]
+        ]
+        chat_memory = ChatMessageHistory(messages=messages)
 
         LLM.set_chat_memory(chat_memory=chat_memory)
 
@@ -290,40 +371,35 @@ class IntentService:
         Args:
             message (Message): The messagebus data
         """
-        try:
-            # TODO: Remove this soon
-            lang = _get_message_lang(message)
-            set_default_lf_lang(lang)
-
-            utterance = message.data.get("utterances", [])[0]
-
-            stopwatch = Stopwatch()
-
-            # Create matchers
-            padatious_matcher = PadatiousMatcher(self.padatious_service)
-
-            # List of functions to use to match the utterance with intent.
-            # These are listed in priority order.
-            match_funcs = [
-                self._converse,
-                padatious_matcher.match_high,
-                self.adapt_service.match_intent,
-                self.persona.match,
-                self.fallback.high_prio,
-                padatious_matcher.match_medium,
-                self.fallback.medium_prio,
-                padatious_matcher.match_low,
-                self.fallback.low_prio,
-            ]
-
-            match = None
-            with stopwatch:
-                # Loop through the matching functions until a match is found.
-                for match_func in match_funcs:
+        # TODO: Remove this soon
+        lang = _get_message_lang(message)
+        self._set_default_lang(lang)
+
+        utterances = message.data.get("utterances")
+        if not utterances:
+            LOG.warning("Utterance message without utterances, ignoring it")
+            return
+        utterance = utterances[0]
+
+        stopwatch = Stopwatch()
+
+        self._padatious_matcher.reset()
+        if self._match_executor is not None:
+            self._padatious_matcher.prefetch(utterance, self._match_executor)
+
+        emit = self.bus.emit
+        match = None
+        with stopwatch:
+            # Loop through the matching functions until a match is found.
+            for match_func in self._match_funcs:
+                try:
                     match = match_func(utterance, lang, message)
-                    if match:
-
-                        break
+                except Exception:
+                    LOG.exception(f"Intent matcher {match_func.__name__} failed")
+                    continue
+                if match:
+                    break
+        try:
             if match:
                 if match.skill_id:
                     self.add_active_skill(match.skill_id)
@@ -334,15 +410,14 @@ class IntentService:
                 if match.intent_type:
                     reply = message.reply(match.intent_type, match.intent_data)
                     reply.data["utterances"] = utterance
-                    self.bus.emit(reply)
+                    emit(reply)
 
             else:
                 # Nothing was able to handle the intent
                 # Ask politely for forgiveness for failing in this vital task
                 self.send_complete_intent_failure(message)
-
-        except Exception as err:
-            LOG.exception(err)
+        except Exception:
+            LOG.exception("Failed to dispatch the utterance")
 
     def _converse(self, utterance, lang, message):
         """Give active skills a chance at the utterance
@@ -356,21 +431,24 @@ class IntentService:
             IntentMatch if handled otherwise None.
         """
         # check for conversation time-out
-        self.active_skills = [
-            skill
-            for skill in self.active_skills
-            if time.time() - skill[1] <= self.converse_timeout * 60
-        ]
-        LOG.debug(
-            f"skills to handle conversation: {self.intent_api.get_active_skills()}"
-        )
-
-        # check if any skill wants to handle utterance
-        for skill in copy(self.active_skills):
-            if self.do_converse(utterance, skill[0], lang, message):
+        # active_skills is ordered newest first, so expired skills are at the end
+        timeout = time.time() - self.converse_timeout * 60
+        while self.active_skills:
+            skill_id, timestamp = next(reversed(self.active_skills.items()))
+            if timestamp >= timeout:
+                break
+            del self.active_skills[skill_id]
+        active_skills = tuple(self.active_skills)
+        LOG.debug(f"skills to handle conversation: {active_skills}")
+
+        # check if any skill wants to handle utterance. Skills are asked one at
+        # a time, most recent first, since a skill accepting the utterance
+        # also handles it.
+        for skill_id in active_skills:
+            if self.do_converse(utterance, skill_id, lang, message):
                 # update timestamp, or there will be a timeout where
                 # intent stops conversing whether its being used or not
-                return IntentMatch("Converse", None, None, skill[0])
+                return IntentMatch("Converse", None, None, skill_id)
         return None
 
     def send_complete_intent_failure(self, message):
@@ -405,6 +483,7 @@ class IntentService:
         """
         intent = open_intent_envelope(message)
         self.adapt_service.register_intent(intent)
+        self._adapt_manifest = None
 
     def handle_detach_intent(self, message):
         """Remover adapt intent.
@@ -414,6 +493,7 @@ class IntentService:
         """
         intent_name = message.data.get("intent_name")
         self.adapt_service.detach_intent(intent_name)
+        self._adapt_manifest = None
 
     def handle_detach_skill(self, message):
         """Remove all intents registered for a specific skill.
@@ -423,6 +503,7 @@ class IntentService:
         """
         skill_id = message.data.get("skill_id")
         self.adapt_service.detach_skill(skill_id)
+        self._adapt_manifest = None
 
     def handle_add_context(self, message):
         """Add context
@@ -459,6 +540,31 @@ class IntentService:
         """Clears all keywords from context"""
         self.adapt_service.context_manager.clear_context()
 
+    def _get_intent_data(self, utterance, lang, message):
+        """Find the intent an utterance would trigger.
+
+        Args:
+            utterance (str): utterance to match
+            lang (str): language of the utterance
+            message (Message): message containing the request
+
+        Returns:
+            dict: intent data, None if no intent was matched
+        """
+        # Loop through the matching functions until a match is found.
+        for match_func in self._intent_match_funcs:
+            match = match_func(utterance, lang, message)
+            if match:
+                if not match.intent_type:
+                    return None
+                intent_data = match.intent_data
+                intent_data["intent_name"] = match.intent_type
+                intent_data["intent_service"] = match.intent_service
+                intent_data["skill_id"] = match.skill_id
+                intent_data["handler"] = match_func.__name__
+                return intent_data
+        return None
+
     def handle_get_intent(self, message):
         """Get intent from either adapt or padatious.
 
@@ -468,41 +574,31 @@ class IntentService:
         utterance = message.data["utterance"]
         lang = message.data.get("lang", "en-us")
 
-        # Create matchers
-        padatious_matcher = PadatiousMatcher(self.padatious_service)
+        self._padatious_matcher.reset()
+        intent_data = self._get_intent_data(utterance, lang, message)
+        self.bus.emit(
+            message.reply("intent.service.intent.reply", {"intent": intent_data})
+        )
 
-        # List of functions to use to match the utterance with intent.
-        # These are listed in priority order.
-        # TODO once we have a mechanism for checking if a fallback will
-        #  trigger without actually triggering it, those should be added here
-        match_funcs = [
-            padatious_matcher.match_high,
-            self.adapt_service.match_intent,
-            # self.fallback.high_prio,
-            padatious_matcher.match_medium,
-            # self.fallback.medium_prio,
-            padatious_matcher.match_low,
-            # self.fallback.low_prio
+    def handle_get_intent_batch(self, message):
+        """Get the intents for a list of utterances in a single reply.
+
+        Args:
+            message (Message): message containing the utterances
+        """
+        utterances = message.data["utterances"]
+        lang = message.data.get("lang", "en-us")
+
+        self._padatious_matcher.reset()
+        if self._match_executor is not None:
+            for utterance in utterances:
+                self._padatious_matcher.prefetch(utterance, self._match_executor)
+        intents = [
+            self._get_intent_data(utterance, lang, message) for utterance in utterances
         ]
-        # Loop through the matching functions until a match is found.
-        for match_func in match_funcs:
-            match = match_func(utterance, lang, message)
-            if match:
-                if match.intent_type:
-                    intent_data = match.intent_data
-                    intent_data["intent_name"] = match.intent_type
-                    intent_data["intent_service"] = match.intent_service
-                    intent_data["skill_id"] = match.skill_id
-                    intent_data["handler"] = match_func.__name__
-                    self.bus.emit(
-                        message.reply(
-                            "intent.service.intent.reply", {"intent": intent_data}
-                        )
-                    )
-                return
-
-        # signal intent failure
-        self.bus.emit(message.reply("intent.service.intent.reply", {"intent": None}))
+        self.bus.emit(
+            message.reply("intent.service.intent.batch.reply", {"intents": intents})
+        )
 
     def handle_get_skills(self, message):
         """Send registered skills to caller.
@@ -522,7 +618,8 @@ class IntentService:
         """
         self.bus.emit(
             message.reply(
-                "intent.service.active_skills.reply", {"skills": self.active_skills}
+                "intent.service.active_skills.reply",
+                {"skills": [list(skill) for skill in self.active_skills.items()]},
             )
         )
 
@@ -1,9 +1,9 @@
 """Intent service wrapping padatious."""
+from copy import copy
+from functools import lru_cache
 from os.path import expanduser, isfile
 from subprocess import call
-from threading import Event
-from time import sleep
-from time import time as get_time
+from threading import Event, Lock, Timer
 
 import source.intent_services
 from source.configuration import Configuration
@@ -12,13 +12,58 @@ from source.util.log import LOG
 
 
 class PadatiousMatcher:
-    """Matcher class to avoid redundancy in padatious intent matching."""
+    """Matcher class to avoid redundancy in padatious intent matching.
+
+    The padatious result is calculated once per utterance and reused by the
+    different confidence levels. A matcher can be shared between threads,
+    call reset() to forget earlier utterances.
+    """
 
     def __init__(self, service):
         self.service = service
-        self.has_result = False
-        self.ret = None
-        self.conf = None
+        self._results = {}  # utterance: (IntentMatch, confidence)
+        self._pending = {}  # utterance: Future from prefetch()
+
+    def reset(self):
+        """Forget the results calculated for earlier utterances."""
+        self._results = {}
+        self._pending = {}
+
+    def prefetch(self, utterance, executor):
+        """Start calculating the result for an utterance in the background.
+
+        Args:
+            utterance (str): utterance to match
+            executor (Executor): executor to run the calculation in
+        """
+        self._pending[utterance] = executor.submit(self._calc_match, utterance)
+
+    def _calc_match(self, utterance):
+        """Calculate the padatious match for an utterance.
+
+        Returns:
+            tuple: (IntentMatch, confidence), both None if nothing matched
+        """
+        padatious_intent = None
+        ret, conf = None, None
+
+        intent = self.service.calc_intent(utterance)
+        if intent:
+            best = padatious_intent.conf if padatious_intent else 0.0
+            if best < intent.conf:
+                padatious_intent = intent
+                padatious_intent.matches["utterance"] = utterance
+
+        if padatious_intent:
+            skill_id = padatious_intent.name.split(":")[0]
+            ret = source.intent_services.IntentMatch(
+                "Padatious",
+                padatious_intent.name,
+                padatious_intent.matches,
+                skill_id,
+            )
+            conf = padatious_intent.conf
+        return ret, conf
 
     def _match_level(self, utterance, limit):
         """Match intent and make sure a certain level of confidence is reached.
@@ -28,30 +73,19 @@ class PadatiousMatcher:
                                          with optional normalized version.
             limit (float): required confidence level.
         """
-        if not self.has_result:
-            padatious_intent = None
+        result = self._results.get(utterance)
+        if result is None:
             LOG.debug("Padatious Matching confidence > {}".format(limit))
-
-            intent = self.service.calc_intent(utterance)
-            if intent:
-                best = padatious_intent.conf if padatious_intent else 0.0
-                if best < intent.conf:
-                    padatious_intent = intent
-                    padatious_intent.matches["utterance"] = utterance
-
-            if padatious_intent:
-                skill_id = padatious_intent.name.split(":")[0]
-                self.ret = source.intent_services.IntentMatch(
-                    "Padatious",
-                    padatious_intent.name,
-                    padatious_intent.matches,
-                    skill_id,
-                )
-                self.conf = padatious_intent.conf
-            self.has_result = True
-
-        if self.conf and self.conf > limit:
-            return self.ret
+            future = self._pending.pop(utterance, None)
+            if future is not None:
+                result = future.result()
+            else:
+                result = self._calc_match(utterance)
+            self._results[utterance] = result
+
+        ret, conf = result
+        if conf and conf > limit:
+            return ret
         return None
 
     def match_high(self, utterance, _=None, __=None):
@@ -107,6 +141,9 @@ class PadatiousService:
             return
 
         self.container = IntentContainer(intent_cache)
+        # Results only change with the registered intents, the cache is
+        # cleared whenever intents are registered, detached or trained.
+        self._intent_cache = lru_cache(maxsize=512)(self.container.calc_intent)
 
         self._bus = bus
         self.bus.on("padatious:register_intent", self.register_intent)
@@ -119,7 +156,8 @@ class PadatiousService:
         self.finished_initial_train = False
 
         self.train_delay = self.padatious_config["train_delay"]
-        self.train_time = get_time() + self.train_delay
+        self._train_timer = None
+        self._train_timer_lock = Lock()
 
         self.registered_intents = []
         self.registered_entities = []
@@ -140,6 +178,7 @@ class PadatiousService:
 
         LOG.info("Training... (single_thread={})".format(single_thread))
         self.container.train(single_thread=single_thread)
+        self._intent_cache.cache_clear()
         LOG.info("Training complete.")
 
         self.finished_training_event.set()
@@ -148,16 +187,19 @@ class PadatiousService:
             self.finished_initial_train = True
 
     def wait_and_train(self):
-        """Wait for minimum time between training and start training."""
+        """Train once no new objects were registered for train_delay seconds.
+
+        Every call restarts the delay so a burst of registrations results in
+        a single training run.
+        """
         if not self.finished_initial_train:
             return
-        sleep(self.train_delay)
-        if self.train_time < 0.0:
-            return
-
-        if self.train_time <= get_time() + 0.01:
-            self.train_time = -1.0
-            self.train()
+        with self._train_timer_lock:
+            if self._train_timer is not None:
+                self._train_timer.cancel()
+            self._train_timer = Timer(self.train_delay, self.train)
+            self._train_timer.daemon = True
+            self._train_timer.start()
 
     def __detach_intent(self, intent_name):
         """Remove an intent if it has been registered.
@@ -168,6 +210,7 @@ class PadatiousService:
         if intent_name in self.registered_intents:
             self.registered_intents.remove(intent_name)
             self.container.remove_intent(intent_name)
+            self._intent_cache.cache_clear()
 
     def handle_detach_intent(self, message):
         """Messagebus handler for detaching padatious intent.
@@ -206,7 +249,7 @@ class PadatiousService:
             return
 
         register_func(name, file_name)
-        self.train_time = get_time() + self.train_delay
+        self._intent_cache.cache_clear()
         self.wait_and_train()
 
     def register_intent(self, message):
@@ -230,14 +273,14 @@ class PadatiousService:
     def calc_intent(self, utt):
         """Cached version of container calc_intent.
 
-        This improves speed when called multiple times for different confidence
-        levels.
-
-        NOTE: This cache will keep a reference to this class
-        (PadatiousService), but we can live with that since it is used as a
-        singleton.
+        This improves speed for repeated utterances. The cached result is
+        copied so callers can't modify the stored matches.
 
         Args:
             utt (str): utterance to calculate best intent for
         """
-        return self.container.calc_intent(utt)
+        intent = self._intent_cache(utt)
+        if intent is not None:
+            intent = copy(intent)
+            intent.matches = dict(intent.matches)
+        return intent
@@ -7,6 +7,7 @@ from source.core import Skill
 from source.llm import LLM, main_persona_prompt
 from source.messagebus.message import Message
 from source.util import LOG
+from source.util.string_utils import SentenceAggregator
 
 config = Configuration.get()
 
@@ -52,7 +53,7 @@ class QAService:
         return True
 
     def handle_query_response(self, utterance: str, message: dict) -> bool:
-        sentence = ""
+        sentences = SentenceAggregator()
         system_message = ""
         try:
             # get response from llm when chat is initiated from UI
@@ -96,7 +97,6 @@ class QAService:
                             )
                         # self.capabilities.send_to_ui(chunk)
                     if chunk["type"] == "message" and "content" in chunk:
-                        sentence += chunk["content"]
                         system_message += chunk[
                             "content"
                         ]  # Continuously add chunk to system message
@@ -106,9 +106,8 @@ class QAService:
                                 {"content": chunk},
                             )
                         )
-                        if any([punct in sentence for punct in ".?!\n"]):
+                        for sentence in sentences.push(chunk["content"]):
                             LLM._speak(sentence)
-                            sentence = ""
                     elif chunk["type"] == "code" and "content" in chunk:
                         self.bus.emit(
                             Message(
@@ -119,7 +118,10 @@ class QAService:
                         # self.capabilities.send_to_ui(chunk)
 
                     if "end" in chunk:
-                        LOG.debug("system message: " + sentence)
+                        sentence = sentences.flush()
+                        if sentence:
+                            LLM._speak(sentence)
+                        LOG.debug("system message: " + system_message)
                         if chunk["type"] == "code":
                             self.bus.emit(
                                 Message(
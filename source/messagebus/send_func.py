@@ -1,32 +1,67 @@
+from functools import lru_cache
+from threading import Lock
+
 from websocket import create_connection
 
-from source.configuration import Configuration
 from source.messagebus.client import MessageBusClient
+from source.messagebus.load_config import load_message_bus_config
 from source.messagebus.message import Message
 
+# Connected client of the service running in this process, if any
+_client = None
+_client_lock = Lock()
+
+
+def set_client(bus):
+    """Use an already connected client for the sends of this process.
+
+    Services connecting their own client register it here so send() doesn't
+    open a second connection to the bus.
+
+    Args:
+        bus (MessageBusClient): connected messagebus client
+    """
+    global _client
+    with _client_lock:
+        _client = bus
+
+
+@lru_cache(maxsize=1)
+def _bus_url():
+    """Calculate the standard messagebus websocket address.
+
+    The configuration is only read on the first send of the process.
+    """
+    config = load_message_bus_config()
+    return MessageBusClient.build_url(
+        config.host, config.port, config.route, config.ssl
+    )
+
 
 def send(message_to_send, data_to_send=None):
     """Send a single message over the websocket.
 
+    The connection of the service registered through set_client() is reused.
+    Other processes, like the send CLI, open a connection for the message and
+    close it again, failing right away if the bus can't be reached.
+
     Args:
         message_to_send (str): Message to send
         data_to_send (dict): data structure to go along with the
             message, defaults to empty dict.
     """
     data_to_send = data_to_send or {}
+    message = Message(message_to_send, data_to_send)
 
-    # Calculate the standard Mycroft messagebus websocket address
-    config = Configuration.get(cache=False, remote=False)
-    config = config.get("websocket")
-    url = MessageBusClient.build_url(
-        config.get("host"),
-        config.get("port"),
-        config.get("route"),
-        config.get("ssl")
-    )
+    with _client_lock:
+        client = _client
+    if client is not None:
+        client.emit(message)
+        return
 
     # Send the provided message/data
-    ws = create_connection(url)
-    packet = Message(message_to_send, data_to_send).serialize()
-    ws.send(packet)
-    ws.close()
+    ws = create_connection(_bus_url())
+    try:
+        ws.send(message.serialize())
+    finally:
+        ws.close()
@@ -18,7 +18,9 @@ import base64
 import hashlib
 import json
 import re
+from functools import lru_cache
 from pathlib import Path
+from time import monotonic
 from typing import List, Set, Tuple
 from urllib import parse
 
@@ -28,6 +30,9 @@ from source.util.file_utils import (curate_cache, ensure_directory_exists,
                                     get_cache_directory)
 from source.util.log import LOG
 
+# Minimum number of seconds between two disk space checks in curate()
+CURATE_INTERVAL = 60
+
 
 def _get_mimic2_audio(sentence: str, url: str) -> Tuple[bytes, str]:
     """Use the Mimic2 API to retrieve the audio for a sentence.
@@ -45,9 +50,12 @@ def _get_mimic2_audio(sentence: str, url: str) -> Tuple[bytes, str]:
     return audio, phonemes
 
 
+@lru_cache(maxsize=256)
 def hash_sentence(sentence: str):
     """Convert the sentence into a hash value used for the file name
 
+    Results are cached since the same replies are often spoken repeatedly.
+
     Args:
         sentence: The sentence to be cached
     """
@@ -147,6 +155,7 @@ class TextToSpeechCache:
         self.audio_file_type = audio_file_type
         self.resource_dir = Path(__file__).parent.parent.joinpath("res")
         self.cached_sentences = dict()
+        self._last_curate = None
 
     def __contains__(self, sha):
         """The cache contains a SHA if it knows of it and it exists on disk."""
@@ -296,7 +305,17 @@ class TextToSpeechCache:
                 cache_file_path.unlink()
 
     def curate(self):
-        """Remove cache data if disk space is running low."""
+        """Remove cache data if disk space is running low.
+
+        Called at the end of every utterance, the check is only done once per
+        CURATE_INTERVAL seconds.
+        """
+        now = monotonic()
+        if (self._last_curate is not None and
+                now - self._last_curate < CURATE_INTERVAL):
+            return
+        self._last_curate = now
+
         files_removed = curate_cache(self.temporary_cache_dir,
                                      min_free_percent=100)
 
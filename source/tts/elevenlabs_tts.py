@@ -1,16 +1,67 @@
-from pathlib import Path
-
-from elevenlabs import generate, set_api_key, stream
-from elevenlabs.api import Voices
+import os
+import struct
+from functools import lru_cache
 
 from source import LOG
 from source.configuration import Configuration
 
+from .http_client import get_http_client
 from .tts import TTS, TTSValidator
 
+API_URL = os.environ.get("ELEVEN_BASE_URL", "https://api.elevenlabs.io/v1")
+
+# elevenlabs is imported where it is used, so the package is only loaded when
+# this backend is selected
+
+
+def _wav_header(sample_rate, data_size=0):
+    """Build the 44 byte header of a 16 bit mono PCM wav file."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        1,  # channels
+        sample_rate,
+        sample_rate * 2,  # byte rate
+        2,  # block align
+        16,  # bits per sample
+        b"data",
+        data_size,
+    )
+
+
+def _write_all(fd, *buffers):
+    """Write the buffers to fd with a single writev, finishing the remainder
+    with plain writes if the kernel accepted less."""
+    written = os.writev(fd, buffers)
+    for buffer in buffers:
+        if written >= len(buffer):
+            written -= len(buffer)
+            continue
+        view = memoryview(buffer)[written:]
+        written = 0
+        while view:
+            view = view[os.write(fd, view):]
+
+
+@lru_cache(maxsize=4)
+def _get_voices(api_key):
+    """Fetch the voices available to an api key, once per key."""
+    from elevenlabs import set_api_key
+    from elevenlabs.api import Voices
+
+    set_api_key(api_key)
+    return Voices.from_api(api_key=api_key)
+
 
 class ElevenLabsTTS(TTS):
     def __init__(self, lang, config):
+        from elevenlabs import set_api_key
+
         super(ElevenLabsTTS, self).__init__(lang, config, ElevenLabsTTSValidator(self))
         self.config = Configuration.get().get("audio").get("tts", {}).get("elevenlabs", {})
         self.voice_name: str = self.config.get("voice_name")
@@ -21,15 +72,20 @@ class ElevenLabsTTS(TTS):
         self.similarity_boost = self.config.get(self.voice_name, "Antoni").get(
             "similarity_boost", 0.23
         )
+        self.model = self.config.get("model", "eleven_multilingual_v2")
+        # raw pcm is requested from the streaming endpoint, the sample rate
+        # must match one of the pcm_* output formats offered by elevenlabs
+        self.sample_rate = self.config.get("sample_rate", 22050)
+        self.latency = self.config.get("optimize_streaming_latency", 3)
+        # model used when synthesis is fed from a stream of text fragments
+        self.stream_model = self.config.get("stream_model", "eleven_turbo_v2_5")
         set_api_key(self.api_key)
-        voices = Voices.from_api()
-        # self.voice = voices[voices.index(self.voice_id)]
+        voices = _get_voices(self.api_key)
         # dynamically select based on config
-        for voice in voices:
-            if voice.name == self.voice_name:
-                self.voice = voice
-                LOG.info("Loading elevenlabs voice: " + self.voice.name)
-                break
+        self.voice = next((v for v in voices if v.name == self.voice_name), None)
+        if self.voice is None:
+            raise ValueError(f"elevenlabs voice {self.voice_name} not found")
+        LOG.info("Loading elevenlabs voice: " + self.voice.name)
 
         LOG.info(f"elevenlabs voice settings: {self.voice.settings}")
         # self.voice.settings.stability = self.stability
@@ -37,19 +93,109 @@ class ElevenLabsTTS(TTS):
         # self.type = 'mp3'
 
     def get_tts(self, sentence, wav_file):
-        audio = generate(
-            model="eleven_multilingual_v2", text=sentence, voice=self.voice
-        )
-        Path(wav_file).write_bytes(audio)
-        # LOG.info(os.path.dirname(os.path.realpath(__file__)))
-        # save(audio, "audio.wav")
-        # LOG.info(wav_file)
-        # stream(audio)
+        """Synthesize audio using the elevenlabs streaming endpoint.
+
+        PCM chunks are appended to the wav file as they arrive instead of
+        buffering the whole utterance in memory first.
+        """
+        self._write_wav(self.generate_stream(sentence), wav_file)
+        return (wav_file, None)
+
+    def get_tts_stream(self, text_iter, wav_file):
+        """Synthesize audio from an iterator of text fragments.
+
+        The fragments are forwarded to the elevenlabs input streaming
+        endpoint as they are produced so synthesis starts on the first
+        sentence instead of after the complete response is known.
+
+        Args:
+            text_iter (iterator): text fragments, usually complete sentences
+            wav_file (str): output file
+
+        Returns:
+            tuple: (wav_file, phoneme)
+        """
+        self._write_wav(self.generate_stream(text_iter, self.stream_model), wav_file)
         return (wav_file, None)
 
+    def generate_stream(self, text, model=None):
+        """Start streaming raw 16 bit mono PCM for the text.
+
+        Sentences are requested over the shared http client, iterators of
+        text fragments go through the elevenlabs input streaming websocket.
+
+        Args:
+            text (str|iterator): Sentence or text fragments to synthesize
+            model (str): model to use, defaults to the configured model
+
+        Returns:
+            iterator of bytes at self.sample_rate
+        """
+        model = model or self.model
+        if isinstance(text, str):
+            return self._request_stream(text, model)
+
+        from elevenlabs import generate
+
+        return generate(
+            text=text,
+            model=model,
+            voice=self.voice,
+            stream=True,
+            latency=self.latency,
+            output_format=f"pcm_{self.sample_rate}",
+        )
+
+    def _request_stream(self, sentence, model):
+        settings = self.voice.settings
+        with get_http_client().stream(
+            "POST",
+            f"{API_URL}/text-to-speech/{self.voice.voice_id}/stream",
+            params={
+                "optimize_streaming_latency": self.latency,
+                "output_format": f"pcm_{self.sample_rate}",
+            },
+            headers={"xi-api-key": self.api_key},
+            json={
+                "text": sentence,
+                "model_id": model,
+                "voice_settings": settings.model_dump() if settings else None,
+            },
+        ) as response:
+            response.raise_for_status()
+            yield from response.iter_bytes()
+
+    def _write_wav(self, audio_stream, wav_file):
+        """Write PCM chunks to the wav file as they are received.
+
+        The header is written up front with an empty data size and filled in
+        once the stream has ended.
+        """
+        fd = os.open(wav_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            chunks = iter(audio_stream)
+            # header and first chunk go out in the same syscall
+            first_chunk = next(chunks, b"")
+            _write_all(fd, _wav_header(self.sample_rate), first_chunk)
+            data_size = len(first_chunk)
+            for chunk in chunks:
+                _write_all(fd, chunk)
+                data_size += len(chunk)
+            os.pwrite(fd, _wav_header(self.sample_rate, data_size), 0)
+        finally:
+            os.close(fd)
+
     def stream_tts(self, sentence):
+        """Stream synthesized speech straight to the playback sink.
+
+        Args:
+            sentence (str|iterator): Sentence or text fragments to synthesize
+        """
+        from elevenlabs import generate, stream
+
+        model = self.model if isinstance(sentence, str) else self.stream_model
         audio_stream = generate(
-            text=sentence, model="eleven_multilingual_v2", voice=self.voice, stream=True
+            text=sentence, model=model, voice=self.voice, stream=True
         )
         stream(audio_stream)
 
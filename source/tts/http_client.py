@@ -0,0 +1,41 @@
+"""HTTP client shared by the TTS backends using a remote service.
+
+Reusing a single client keeps the connections to the services open between
+utterances, so only the first request pays for the TCP and TLS handshakes.
+"""
+from threading import Lock
+
+import httpx
+
+from source.util.log import LOG
+
+_client = None
+_client_lock = Lock()
+
+
+def _http2_supported():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client():
+    """Get the process wide http client, it is created on first use.
+
+    Returns:
+        httpx.Client: pooled client, using HTTP/2 if h2 is installed
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            http2 = _http2_supported()
+            if not http2:
+                LOG.debug("h2 is not installed, TTS requests will use HTTP/1.1")
+            _client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(max_keepalive_connections=4),
+                timeout=30,
+            )
+        return _client
@@ -1,30 +1,31 @@
-from pathlib import Path
-
-from openai import OpenAI
-
 from source import LOG
 from source.configuration import Configuration
 
+from .http_client import get_http_client
 from .tts import TTS, TTSValidator
 
 
 class OpenAITTS(TTS):
     def __init__(self, lang, config):
+        from openai import OpenAI
+
         super(OpenAITTS, self).__init__(lang, config, OpenAITTSValidator(self))
         self.config = Configuration.get().get("audio").get("tts").get("openai")
         self.api_key = Configuration.get().get("microservices").get("openai_key")
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(api_key=self.api_key, http_client=get_http_client())
 
     def get_tts(self, sentence, wav_file):
-        response = self.client.audio.speech.create(
+        """Synthesize audio using the OpenAI speech endpoint.
+
+        The response body is streamed to the file in binary chunks as it is
+        received rather than being downloaded completely first.
+        """
+        with self.client.audio.speech.with_streaming_response.create(
             model=self.config.get("model", {}),
             voice=self.config.get("voice", {}),
             input=sentence,
-        )
-        # audio = response.choices[0].message["content"]
-        response.stream_to_file(wav_file)
-        # Path(wav_file).write_bytes(response.audio)
-        # LOG.info(wav_file)
+        ) as response:
+            response.stream_to_file(wav_file)
         return (wav_file, None)
 
 
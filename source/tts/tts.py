@@ -3,12 +3,13 @@ import os.path
 import random
 import re
 from abc import ABCMeta, abstractmethod
-from copy import deepcopy
+from importlib import import_module
 from os.path import dirname, exists, isdir, join
 from pathlib import Path
-from queue import Empty, Queue
+from queue import Queue
 from threading import Thread
 from warnings import warn
+from weakref import WeakSet
 
 # from core.enclosure.api import EnclosureAPI
 from source.api import SystemApi
@@ -23,14 +24,16 @@ from source.util.plugins import load_plugin
 
 from .cache import TextToSpeechCache, hash_sentence
 
-_TTS_ENV = deepcopy(os.environ)
+_TTS_ENV = os.environ.copy()
 _TTS_ENV["PULSE_PROP"] = "media.role=phone"
 
 EMPTY_PLAYBACK_QUEUE_TUPLE = (None, None, None, None, None)
 
 SSML_TAGS = re.compile(r"<[^>]*>")
 WHITESPACE_AFTER_PERIOD = re.compile(r"\b([A-za-z][\.])(\s+)")
-SENTENCE_DELIMITERS = re.compile(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\;|\?)\s")
+# The delimiter lookbehind comes first, it rejects most positions cheaply
+SENTENCE_DELIMITERS = re.compile(r"(?<=[.;?])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s")
+WORD_RE = re.compile(r"[\w']+")
 
 
 def default_preprocess_utterance(utterance):
@@ -56,7 +59,7 @@ class PlaybackThread(Thread):
     def __init__(self, queue):
         super(PlaybackThread, self).__init__()
         self.queue = queue
-        self.tts = []
+        self.tts = WeakSet()
         self.bus = None
         self.api = SystemApi()
 
@@ -82,16 +85,23 @@ class PlaybackThread(Thread):
 
     def attach_tts(self, tts):
         """Add TTS to be cache checked."""
-        self.tts.append(tts)
+        self.tts.add(tts)
 
     def detach_tts(self, tts):
         """Remove TTS from cache check."""
-        self.tts.remove(tts)
+        self.tts.discard(tts)
 
     def clear_queue(self):
         """Remove all pending playbacks."""
-        while not self.queue.empty():
-            self.queue.get()
+        with self.queue.mutex:
+            self.queue.queue.clear()
+            self.queue.unfinished_tasks = 0
+            self.queue.all_tasks_done.notify_all()
+            self.queue.not_full.notify_all()
+            if self._terminated:
+                # Keep the entry waking up the playback loop
+                self.queue.queue.append(EMPTY_PLAYBACK_QUEUE_TUPLE)
+                self.queue.not_empty.notify()
         try:
             self.p.terminate()
         except Exception:
@@ -112,10 +122,16 @@ class PlaybackThread(Thread):
 
         If the queue is empty the end_audio() is called possibly triggering
         listening.
+
+        The loop blocks until there is something to play, stop() wakes it
+        up by queueing an EMPTY_PLAYBACK_QUEUE_TUPLE.
         """
         while not self._terminated:
             try:
-                (snd_type, data, visemes, ident, listen) = self.queue.get(timeout=2)
+                item = self.queue.get()
+                if item == EMPTY_PLAYBACK_QUEUE_TUPLE:
+                    continue
+                (snd_type, data, visemes, ident, listen) = item
                 if not self._processing_queue:
                     self._processing_queue = True
                     self.begin_audio()
@@ -127,15 +143,12 @@ class PlaybackThread(Thread):
                     elif snd_type == "mp3":
                         self.p = play_mp3(data, environment=self.pulse_env)
                     if self.p:
-                        self.p.communicate()
                         self.p.wait()
 
                 if self.queue.empty():
                     self.end_audio(listen)
                     self._processing_queue = False
 
-            except Empty:
-                pass
             except Exception as e:
                 LOG.exception(e)
                 if self._processing_queue:
@@ -168,6 +181,10 @@ class PlaybackThread(Thread):
             listen (bool): True if listening event should be emitted
         """
         if self.bus:
+            # This check will clear the filesystem IPC "signal", done before
+            # the end of speech is announced so listeners see it cleared
+            check_for_signal("isSpeaking")
+
             # Send end of speech signals to the system
             context = {
                 "client_name": "core_audio_pbthread",
@@ -179,11 +196,8 @@ class PlaybackThread(Thread):
 
             # Clear cache for all attached tts objects
             # This is basically the only safe time
-            for tts in self.tts:
+            for tts in list(self.tts):
                 tts.cache.curate()
-
-            # This check will clear the filesystem IPC "signal"
-            check_for_signal("isSpeaking")
         else:
             LOG.warning("Speech started before bus was attached.")
 
@@ -216,6 +230,8 @@ class TTS(metaclass=ABCMeta):
 
     queue = None
     playback = None
+    # Engines implementing viseme() set this to have visemes generated
+    compute_visemes = False
 
     def __init__(
         self,
@@ -247,6 +263,7 @@ class TTS(metaclass=ABCMeta):
             TTS.playback.start()
 
         self.spellings = self.load_spellings()
+        self._spelling_re = self._compile_spellings(self.spellings)
         self.tts_name = type(self).__name__
         self.cache = TextToSpeechCache(self.config, self.tts_name, self.audio_ext)
         self.cache.clear()
@@ -264,7 +281,10 @@ class TTS(metaclass=ABCMeta):
         return set()
 
     def load_spellings(self):
-        """Load phonetic spellings of words as dictionary."""
+        """Load phonetic spellings of words as dictionary.
+
+        The words are lower cased, matching is case insensitive.
+        """
         path = join("text", self.lang.lower(), "phonetic_spellings.txt")
         spellings_file = resolve_resource_file(path)
         if not spellings_file:
@@ -273,11 +293,37 @@ class TTS(metaclass=ABCMeta):
             with open(spellings_file) as f:
                 lines = filter(bool, f.read().split("\n"))
             lines = [i.split(":") for i in lines]
-            return {key.strip(): value.strip() for key, value in lines}
+            return {key.strip().lower(): value.strip() for key, value in lines}
         except ValueError:
             LOG.exception("Failed to load phonetic spellings.")
             return {}
 
+    @staticmethod
+    def _compile_spellings(spellings):
+        """Build a pattern matching all words with a phonetic spelling.
+
+        Args:
+            spellings (dict): phonetic spellings keyed by lower case word
+
+        Returns:
+            re.Pattern: pattern matching any of the words, None if there are
+                        no spellings
+        """
+        words = [
+            word
+            for word in spellings
+            if word == word.lower() and WORD_RE.fullmatch(word)
+        ]
+        if not words:
+            return None
+        # Longest first so a word isn't shadowed by one of its prefixes
+        words.sort(key=len, reverse=True)
+        alternation = "|".join(map(re.escape, words))
+        return re.compile(rf"(?<![\w'])(?:{alternation})(?![\w'])", re.IGNORECASE)
+
+    def _spell(self, match):
+        return self.spellings[match.group().lower()]
+
     def begin_audio(self):
         """Helper function for child classes to call in execute()."""
         # Create signals informing start of speech
@@ -296,13 +342,13 @@ class TTS(metaclass=ABCMeta):
         """
         context = {"client_name": "core_audio_tts", "source": "llm"}
 
+        # This check will clear the "signal"
+        check_for_signal("isSpeaking")
         self.bus.emit(Message("recognizer_loop:audio_output_end", context=context))
         if listen:
             self.bus.emit(Message("core.mic.listen", context=context))
 
         self.cache.curate()
-        # This check will clear the "signal"
-        check_for_signal("isSpeaking")
 
     def init(self, bus):
         """Performs intial setup of TTS object.
@@ -358,7 +404,7 @@ class TTS(metaclass=ABCMeta):
         Returns:
             str: input string stripped from tags.
         """
-        return re.sub("<[^>]*>", "", text).replace("  ", " ")
+        return SSML_TAGS.sub("", text).replace("  ", " ")
 
     def validate_ssml(self, utterance):
         """Check if engine supports ssml, if not remove all tags.
@@ -375,15 +421,15 @@ class TTS(metaclass=ABCMeta):
         if not self.ssml_tags:
             return self.remove_ssml(utterance)
 
-        # find ssml tags in string
-        tags = SSML_TAGS.findall(utterance)
-
-        for tag in tags:
+        def validate_tag(match):
+            tag = match.group()
             if any(supported in tag for supported in self.ssml_tags):
-                utterance = utterance.replace(tag, self.modify_tag(tag))
-            else:
-                # remove unsupported tag
-                utterance = utterance.replace(tag, "")
+                return self.modify_tag(tag)
+            # remove unsupported tag
+            return ""
+
+        # check all ssml tags in a single pass over the string
+        utterance = SSML_TAGS.sub(validate_tag, utterance)
 
         # return text with supported ssml tags only
         return utterance.replace("  ", " ")
@@ -435,33 +481,32 @@ class TTS(metaclass=ABCMeta):
         self._execute(sentence, ident, listen)
 
     def _execute(self, sentence, ident, listen):
-        if self.phonetic_spelling:
-            for word in re.findall(r"[\w']+", sentence):
-                if word.lower() in self.spellings:
-                    sentence = sentence.replace(word, self.spellings[word.lower()])
+        if self.phonetic_spelling and self._spelling_re is not None:
+            sentence = self._spelling_re.sub(self._spell, sentence)
 
         # TODO: 22.02 This is no longer needed and can be removed
         # Just kept for compatibility for now
         chunks = self._preprocess_sentence(sentence)
         # Apply the listen flag to the last chunk, set the rest to False
-        chunks = [
-            (chunks[i], listen if i == len(chunks) - 1 else False)
-            for i in range(len(chunks))
+        chunks = [(chunk, False) for chunk in chunks[:-1]] + [
+            (chunk, listen) for chunk in chunks[-1:]
         ]
 
         for sentence, l in chunks:
             sentence_hash = hash_sentence(sentence)
             if sentence_hash in self.cache:
                 audio_file, phoneme_file = self._get_sentence_from_cache(sentence_hash)
-                if phoneme_file is None:
+                if phoneme_file is None or not self.compute_visemes:
                     phonemes = None
                 else:
                     phonemes = phoneme_file.load()
+                audio_path = str(audio_file.path)
 
             else:
                 audio_file = self.cache.define_audio_file(sentence_hash)
+                audio_path = str(audio_file.path)
                 # TODO 21.08: remove mutation of audio_file.path.
-                returned_file, phonemes = self.get_tts(sentence, str(audio_file.path))
+                returned_file, phonemes = self.get_tts(sentence, audio_path)
                 # Convert to Path as needed
                 returned_file = Path(returned_file)
                 if returned_file != audio_file.path:
@@ -475,14 +520,18 @@ class TTS(metaclass=ABCMeta):
                         )
                     )
                     audio_file.path = returned_file
+                    audio_path = str(returned_file)
                 if phonemes:
                     phoneme_file = self.cache.define_phoneme_file(sentence_hash)
                     phoneme_file.save(phonemes)
                 else:
                     phoneme_file = None
                 self.cache.cached_sentences[sentence_hash] = (audio_file, phoneme_file)
-            viseme = self.viseme(phonemes) if phonemes else None
-            TTS.queue.put((self.audio_ext, str(audio_file.path), viseme, ident, l))
+            if phonemes and self.compute_visemes:
+                viseme = self.viseme(phonemes)
+            else:
+                viseme = None
+            TTS.queue.put((self.audio_ext, audio_path, viseme, ident, l))
 
     def _get_sentence_from_cache(self, sentence_hash):
         cached_sentence = self.cache.cached_sentences[sentence_hash]
@@ -576,11 +625,29 @@ class TTSFactory:
     from TTS engine plugins.
     """
 
-    from source.tts.elevenlabs_tts import ElevenLabsTTS
-    from source.tts.mimic3_tts import Mimic3
-    from source.tts.openai_tts import OpenAITTS
+    # Built-in engines, only the selected one is imported
+    CLASSES = {
+        "mimic3": "source.tts.mimic3_tts.Mimic3",
+        "elevenlabs": "source.tts.elevenlabs_tts.ElevenLabsTTS",
+        "openai": "source.tts.openai_tts.OpenAITTS",
+    }
+
+    @staticmethod
+    def get_class(tts_module):
+        """Get a built-in TTS engine class, importing it on first use.
 
-    CLASSES = {"mimic3": Mimic3, "elevenlabs": ElevenLabsTTS, "openai": OpenAITTS}
+        Args:
+            tts_module (str): name of the engine in CLASSES
+
+        Returns:
+            class: TTS engine class, None if the engine is unknown
+        """
+        clazz = TTSFactory.CLASSES.get(tts_module)
+        if isinstance(clazz, str):
+            module_name, class_name = clazz.rsplit(".", 1)
+            clazz = getattr(import_module(module_name), class_name)
+            TTSFactory.CLASSES[tts_module] = clazz
+        return clazz
 
     @staticmethod
     def create():
@@ -600,7 +667,7 @@ class TTSFactory:
         tts_lang = tts_config.get("lang", lang)
         try:
             if tts_module in TTSFactory.CLASSES:
-                clazz = TTSFactory.CLASSES[tts_module]
+                clazz = TTSFactory.get_class(tts_module)
             else:
                 clazz = load_tts_plugin(tts_module)
                 LOG.info("LOADED PLUGIN {}".format(tts_module))
@@ -616,7 +683,7 @@ class TTSFactory:
                     "The selected TTS backend couldn't be loaded. "
                     "Falling back to Mimic"
                 )
-                clazz = TTSFactory.CLASSES.get("mimic3")
+                clazz = TTSFactory.get_class("mimic3")
                 tts_config = config.get("tts", {}).get("mimic3", {})
                 tts = clazz(tts_lang, tts_config)
                 tts.validator.validate()
@@ -1,10 +1,11 @@
 """Functions use multiple times in different places across the application
 """
 import asyncio
-import json
-from time import time
-from typing import Dict, List, Optional
+from threading import Lock
+from time import monotonic, time
+from typing import Dict, List, Optional, Tuple
 
+import orjson
 from fastapi import WebSocket
 from websocket import (WebSocketException, WebSocketTimeoutException,
                        create_connection)
@@ -16,6 +17,11 @@ from source.util.log import LOG
 
 settings = get_settings()
 
+# Answers of read-only bus requests, see ws_send_cached()
+_ws_cache: Dict[bytes, Tuple[float, JSONStructure]] = {}
+_ws_cache_lock = Lock()
+_WS_CACHE_SIZE = 16
+
 
 # TODO: find out if this exits in codebase
 def ws_send(
@@ -46,9 +52,9 @@ def ws_send(
         if wait_for_message:
             timeout_start: float = time()
             data: Dict = {}
-            websocket.send(json.dumps(payload))
+            websocket.send(orjson.dumps(payload))
             while time() < timeout_start + settings.ws_recv_timeout:
-                recv: JSONStructure = json.loads(websocket.recv())
+                recv: JSONStructure = orjson.loads(websocket.recv())
                 if recv["type"] == wait_for_message and recv["data"]:
                     data = recv
                     break
@@ -63,7 +69,7 @@ def ws_send(
             return data
 
         # Send message without wait for message and return an empty JSON dict.
-        websocket.send(json.dumps(payload))
+        websocket.send(orjson.dumps(payload))
         websocket.close()
         return {}
     except WebSocketException as err:
@@ -71,6 +77,46 @@ def ws_send(
         return err
 
 
+def ws_send_cached(
+    payload: JSONStructure, wait_for_message: str
+) -> JSONStructure:
+    """Same as `ws_send` but answers are reused for `settings.ws_cache_ttl`
+    seconds, saving a websocket round-trip for repeated requests.
+
+    Only use it for read-only requests, messages with side effects must go
+    through `ws_send`.
+
+    :param payload: JSON dict to send to the bus
+    :type payload: dict
+    :param wait_for_message: Message to wait for from the bus
+    :type wait_for_message: str
+    :return: Return the received message or and empty dict if nothing to retrun
+    :rtype: JSONStructure
+    """
+    key: bytes = orjson.dumps(
+        [payload, wait_for_message], option=orjson.OPT_SORT_KEYS
+    )
+    with _ws_cache_lock:
+        cached = _ws_cache.get(key)
+        if cached and cached[0] > monotonic():
+            return cached[1]
+
+    data: JSONStructure = ws_send(payload, wait_for_message)
+    # Errors are returned rather than raised, only cache real answers
+    if isinstance(data, dict) and data.get("data"):
+        with _ws_cache_lock:
+            if len(_ws_cache) >= _WS_CACHE_SIZE:
+                _ws_cache.clear()
+            _ws_cache[key] = (monotonic() + settings.ws_cache_ttl, data)
+    return data
+
+
+def ws_cache_clear():
+    """Drop the answers cached by `ws_send_cached`."""
+    with _ws_cache_lock:
+        _ws_cache.clear()
+
+
 def sanitize(data: JSONStructure) -> JSONStructure:
     """Sanitizes JSON dictionnary to avoid data leaking.
 
@@ -112,18 +158,34 @@ class WebSocketManager:
             self.active_websockets.remove(websocket)
 
     async def send_data(self, data: str):
-        await self.queue.put(data)
+        self.queue.put_nowait(data)
+
+    async def flush(self):
+        """Wait until every queued message has been sent, use it when a
+        response must not overtake the messages queued before it."""
+        if self.task and not self.task.done():
+            await self.queue.join()
 
     # TODO: if disconnect has been called the while loop in this function needs to
     # be exited
     async def sender(self, websocket: WebSocket):
         while True:
             try:
+                batch: List = [await self.queue.get()]
+                # Send everything queued up meanwhile within a single wakeup,
+                # one frame per message as the UI parses each frame as JSON.
+                while not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
                 LOG.debug(
                     f"websocket: {websocket} - websocket state:{websocket.client_state}"
+                    f" - sending {len(batch)} message(s)"
                 )
-                data = await self.queue.get()
-                await websocket.send_json(data)
+                try:
+                    for data in batch:
+                        await websocket.send_json(data)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
             except asyncio.CancelledError:
                 # LOG.error(f"Error in sender: {e}")
                 LOG.info(f"CANCELLING sender function with {websocket}")
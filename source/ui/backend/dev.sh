@@ -1 +1,5 @@
-uvicorn core.ui.backend.__main__:app --host 0.0.0.0 --port 8080 --reload
+# uvloop (libuv) and httptools come with uvicorn[standard], select them
+# explicitly so a missing extra fails loudly instead of silently falling back
+# to the pure python asyncio loop and h11 parser.
+uvicorn core.ui.backend.__main__:app --host 0.0.0.0 --port 8080 --reload \
+    --loop uvloop --http httptools
@@ -1,15 +1,25 @@
-import json
 from typing import Dict, Optional
 
 from fastapi import HTTPException, status
 
 from source.ui.backend.common.typing import JSONStructure
-from source.ui.backend.common.utils import sanitize, ws_send
+from source.ui.backend.common.utils import (sanitize, ws_cache_clear, ws_send,
+                                            ws_send_cached)
 from source.ui.backend.config import get_settings
 from source.ui.backend.models.system import Config, Prompt
 from source.util.log import LOG
 
 settings = get_settings()
+_APP_KEY: str = settings.app_key
+
+
+def _sort_recursive(obj):
+    """Sort dictionaries by key, including the ones nested in lists."""
+    if isinstance(obj, dict):
+        return {key: _sort_recursive(obj[key]) for key in sorted(obj)}
+    if isinstance(obj, list):
+        return [_sort_recursive(item) for item in obj]
+    return obj
 
 
 # TODO: Authenticate settings
@@ -32,20 +42,18 @@ def get_config(sort: Optional[bool] = False, core: Optional[bool] = False) -> Co
     try:
         payload: Dict = {
             "type": "core.api.config",
-            "data": {"app_key": settings.app_key, "core": core},
+            "data": {"app_key": _APP_KEY, "core": core},
         }
         # if requirements():
-        config: JSONStructure = ws_send(payload, "core.api.config.answer")
-        if config["context"]["authenticated"]:
-            if sort:
-                config = json.loads(json.dumps(config, sort_keys=True))
-            return sanitize(config["data"])
+        config: JSONStructure = ws_send_cached(payload, "core.api.config.answer")
+        if not config["context"]["authenticated"]:
             status_code = status.HTTP_401_UNAUTHORIZED
             msg = "unable to authenticate with core-api skill"
-            raise Exception
-        status_code = status.HTTP_401_UNAUTHORIZED
-        msg = "core-api skill is not installed on CORE"
-        raise Exception
+            raise RuntimeError(msg)
+        data: JSONStructure = config["data"]
+        if sort:
+            data = _sort_recursive(data)
+        return sanitize(data)
     except Exception as err:
         raise HTTPException(status_code=status_code, detail=msg) from err
 
@@ -62,6 +70,7 @@ def reload_config() -> status:
     try:
         payload: Dict = {"type": "configuration.updated"}
         ws_send(payload)
+        ws_cache_clear()
         return status.HTTP_204_NO_CONTENT
     except Exception as err:
         raise HTTPException(
@@ -80,6 +89,7 @@ def set_config(config: Config):
     try:
         payload: Dict = {"type": "core.api.set.config", "data": {"config": config}}
         ws_send(payload)
+        ws_cache_clear()
         return status.HTTP_201_CREATED
     except Exception as err:
         raise HTTPException(
@@ -1,7 +1,7 @@
 from typing import Dict, Optional
 
 from fastapi import APIRouter, Body, Depends, Query, status
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import ORJSONResponse, Response
 
 from source.ui.backend.auth.bearer import JWTBearer
 from source.ui.backend.common.utils import websocket_manager
@@ -9,7 +9,9 @@ from source.ui.backend.handlers import system
 from source.ui.backend.models.system import ConfigResults, Message, Prompt
 from source.util.log import LOG
 
-router = APIRouter(prefix="/system", tags=["system"])
+router = APIRouter(
+    prefix="/system", tags=["system"], default_response_class=ORJSONResponse
+)
 
 
 @router.get(
@@ -29,7 +31,7 @@ async def config(
     core: Optional[bool] = Query(
         default=False, description="Display the core configuration"
     ),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Collect local or core configuration
 
     :param sort: Sort alphabetically the configuration
@@ -37,9 +39,9 @@ async def config(
     :param core: Retrieve merged configuration
     :type core: bool, optional
     :return: Return the configuration
-    :rtype: JSONResponse
+    :rtype: ORJSONResponse
     """
-    return JSONResponse(content=system.get_config(sort, core))
+    return ORJSONResponse(content=system.get_config(sort, core))
 
 
 @router.put(
@@ -75,7 +77,7 @@ async def send_system_utterance(
         description="Message to send to UI",
         example='{"role": "system", "content": "hey there"}',
     ),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Request to start the recording
 
     :return: HTTP status code
@@ -83,7 +85,7 @@ async def send_system_utterance(
     """
     LOG.info("SENDING MESSAGE TO UI: %s", message.__dict__)
     await websocket_manager.send_data(message.__dict__)
-    return JSONResponse(content={})
+    return ORJSONResponse(content={})
 
 
 @router.post(
@@ -101,14 +103,14 @@ async def set_configuration(
         description="Configuration to set",
         example='{"confirm_listening": false }',
     ),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Request to set the configuration
 
     :return: HTTP status code
     :rtype: int
     """
     LOG.info("SETTING CONFIGURATION: %s", config)
-    return JSONResponse(content=system.set_config(config))
+    return ORJSONResponse(content=system.set_config(config))
 
 
 @router.post(
@@ -127,12 +129,12 @@ async def generate_response(
       strictly adhering to the 3-5 word limit and avoiding the use of the word `title`: \
         what is the purpose of chemistry in the universe?"}',
     ),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Generate a response based on the provided prompt
 
     :param prompt: The prompt to generate a response from
     :type prompt: str
     :return: Generated response
-    :rtype: JSONResponse
+    :rtype: ORJSONResponse
     """
-    return JSONResponse(content=system.generate_response(prompt))
+    return ORJSONResponse(content=system.generate_response(prompt))
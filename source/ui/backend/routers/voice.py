@@ -1,7 +1,8 @@
 """Voice routes
 """
 from fastapi import APIRouter, Body, Depends, status
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import ORJSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 
 from source.ui.backend.auth.bearer import JWTBearer
 from source.ui.backend.config import get_settings
@@ -10,7 +11,9 @@ from source.ui.backend.models.voice import (ContextData, Message, MicState,
                                             Speak)
 from source.util.log import LOG  # noqa: F401
 
-router = APIRouter(prefix="/voice", tags=["voice"])
+router = APIRouter(
+    prefix="/voice", tags=["voice"], default_response_class=ORJSONResponse
+)
 
 settings = get_settings()
 
@@ -30,15 +33,15 @@ async def speaking(
         description="Message to play",
         example='{"utterance": "Vasco for the win", "lang": "en-us"}',
     ),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Request to speak an utterance
 
     :param dialog: Message to play
     :type dialog: dict
     :return: Return message played
-    :rtype: JSONResponse
+    :rtype: ORJSONResponse
     """
-    return JSONResponse(content=voice.speaking(dialog))
+    return ORJSONResponse(content=await run_in_threadpool(voice.speaking, dialog))
 
 
 @router.delete(
@@ -49,7 +52,7 @@ async def speaking(
     response_description="Speech stopped",
     dependencies=[Depends(JWTBearer())],
 )
-async def stop() -> JSONResponse:
+async def stop() -> ORJSONResponse:
     """Request to stop the speech
 
     :return: HTTP status code
@@ -92,13 +95,13 @@ async def set_microphone_state(
     response_description="Microphone status",
     dependencies=[Depends(JWTBearer())],
 )
-async def mic_status() -> JSONResponse:
+async def mic_status() -> ORJSONResponse:
     """Get the status of the microphone
 
     :return: Microphone status
     :rtype: JSONStructure
     """
-    return JSONResponse(voice.get_mic_status())
+    return ORJSONResponse(voice.get_mic_status())
 
 
 @router.put(
@@ -109,7 +112,7 @@ async def mic_status() -> JSONResponse:
     response_description="Microphone listened",
     dependencies=[Depends(JWTBearer())],
 )
-async def listen() -> JSONResponse:
+async def listen() -> ORJSONResponse:
     """Request to start the recording
 
     :return: HTTP status code
@@ -133,9 +136,11 @@ async def handle_utterance(
         description="Message request",
         example='{"role": "user", "content": "what is the time?"}',
     ),
-) -> JSONResponse:
+) -> ORJSONResponse:
     print(f"message: {message}")
-    return JSONResponse(content=voice.handle_utterance(message))
+    # waits for the answer on the bus, keep the event loop free meanwhile
+    response = await run_in_threadpool(voice.handle_utterance, message)
+    return ORJSONResponse(content=response)
 
 
 @router.post(
@@ -157,8 +162,8 @@ async def send_context(
             ],
         },
     ),
-) -> JSONResponse:
-    return JSONResponse(content=voice.send_context(context_data))
+) -> ORJSONResponse:
+    return ORJSONResponse(content=voice.send_context(context_data))
 
 
 @router.delete(
@@ -169,5 +174,5 @@ async def send_context(
     response_description="Response to the stop listening request",
     dependencies=[Depends(JWTBearer())],
 )
-async def stop_listening() -> JSONResponse:
-    return JSONResponse(content=voice.stop_listening())
+async def stop_listening() -> ORJSONResponse:
+    return ORJSONResponse(content=voice.stop_listening())
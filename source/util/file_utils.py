@@ -4,16 +4,23 @@ This module contains functions handling CORE's resource files and things like
 accessing and curating CORE's cache.
 """
 
+import heapq
 import os
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from os.path import dirname
-from stat import S_ISREG, ST_MODE, ST_MTIME, ST_SIZE
-from threading import RLock
+from threading import Lock, Timer
 from typing import List
 
-import psutil
 import xdg.BaseDirectory
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (
+    FileClosedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
 
 from .log import LOG
@@ -21,6 +28,46 @@ from .log import LOG
 # from core import CORE_ROOT_PATH
 
 
+# Observer shared by all FileWatchers, started on first use
+_observer = None
+_observer_lock = Lock()
+_watch_handler_count = {}  # ObservedWatch: number of scheduled handlers
+# Only subscribe to the events FileEventHandler uses, with inotify this keeps
+# reads and opens of watched files from waking the observer
+_WATCHED_EVENTS = [FileCreatedEvent, FileModifiedEvent, FileClosedEvent]
+
+
+def _schedule(handler, path, recursive):
+    """Schedule a handler on the shared observer.
+
+    Watchers of the same directory share the watch.
+
+    Returns:
+        ObservedWatch: the watch the handler was scheduled for
+    """
+    global _observer
+    with _observer_lock:
+        if _observer is None:
+            _observer = Observer()
+            _observer.daemon = True
+            _observer.start()
+        watch = _observer.schedule(
+            handler, path, recursive=recursive, event_filter=_WATCHED_EVENTS
+        )
+        _watch_handler_count[watch] = _watch_handler_count.get(watch, 0) + 1
+        return watch
+
+
+def _unschedule(handler, watch):
+    """Remove a handler, dropping the watch once no handler uses it."""
+    with _observer_lock:
+        _observer.remove_handler_for_watch(handler, watch)
+        _watch_handler_count[watch] -= 1
+        if not _watch_handler_count[watch]:
+            del _watch_handler_count[watch]
+            _observer.unschedule(watch)
+
+
 class FileWatcher:
     def __init__(
         self,
@@ -36,26 +83,24 @@ class FileWatcher:
         @param recursive: If true, recursively include directory contents
         @param ignore_creation: If true, ignore file creation events
         """
-        self.observer = Observer()
-        self.handlers = []
+        self.handlers = []  # (handler, watch) pairs
         for file_path in files:
             if os.path.isfile(file_path):
                 watch_dir = dirname(file_path)
             else:
                 watch_dir = file_path
-            self.observer.schedule(
-                FileEventHandler(file_path, callback, ignore_creation),
-                watch_dir,
-                recursive=recursive,
-            )
-        self.observer.start()
+            handler = FileEventHandler(file_path, callback, ignore_creation)
+            watch = _schedule(handler, watch_dir, recursive)
+            self.handlers.append((handler, watch))
 
     def shutdown(self):
         """
-        Remove observer scheduled events and stop the observer.
+        Remove the handlers of this watcher from the shared observer.
         """
-        self.observer.unschedule_all()
-        self.observer.stop()
+        for handler, watch in self.handlers:
+            _unschedule(handler, watch)
+            handler.cancel()
+        self.handlers = []
 
 
 class FileEventHandler(FileSystemEventHandler):
@@ -64,38 +109,70 @@ class FileEventHandler(FileSystemEventHandler):
     ):
         """
         Create a handler for file change events
-        @param file_path: file_path being watched Unused(?)
+        @param file_path: file or directory being watched
         @param callback: function to call on file change with modified file path
         @param ignore_creation: if True, only track file modification events
         """
         super().__init__()
         self._callback = callback
         self._file_path = file_path
+        # The parent directory is watched for single files, skip events for
+        # its other files before taking the lock
+        self._single_file = os.path.isfile(file_path)
         if ignore_creation:
-            self._events = "modified"
+            self._events = frozenset({"modified"})
         else:
-            self._events = ("created", "modified")
-        self._changed_files = []
-        self._lock = RLock()
+            self._events = frozenset({"created", "modified"})
+        self._changed_files = set()
+        self._lock = Lock()
+        # Files closed within the debounce window are reported by one timer
+        self._debounce = 0.25
+        self._pending_files = set()
+        self._timer = None
 
     def on_any_event(self, event):
         if event.is_directory:
             return
-        with self._lock:
-            if event.event_type == "closed":
-                if event.src_path in self._changed_files:
+        if self._single_file and event.src_path != self._file_path:
+            return
+        if event.event_type == "closed":
+            with self._lock:
+                try:
                     self._changed_files.remove(event.src_path)
-                    # fire event, it is now safe
-                    try:
-                        self._callback(event.src_path)
-                    except:
-                        LOG.exception(
-                            "An error occurred handling file " "change event callback"
-                        )
+                except KeyError:
+                    return
+                # fire event once the burst of writes is over
+                self._pending_files.add(event.src_path)
+                if self._timer is None:
+                    self._timer = Timer(self._debounce, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+        elif event.event_type in self._events:
+            with self._lock:
+                self._changed_files.add(event.src_path)
+
+    def cancel(self):
+        """Drop pending changes so the callback isn't called anymore."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending_files.clear()
 
-            elif event.event_type in self._events:
-                if event.src_path not in self._changed_files:
-                    self._changed_files.append(event.src_path)
+    def _flush(self):
+        """Call the callback for every file closed since the timer started."""
+        with self._lock:
+            pending = self._pending_files
+            self._pending_files = set()
+            self._timer = None
+        for file_path in pending:
+            try:
+                self._callback(file_path)
+            except:
+                LOG.exception(
+                    "An error occurred handling file " "change event callback"
+                )
 
 
 # def find_resource(self, res_name, res_dirname=None):
@@ -168,11 +245,13 @@ def read_stripped_lines(filename):
     Returns:
         (list) list of lines stripped from leading and ending white chars.
     """
-    with open(filename, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                yield line
+    # Read the whole file at once, without a buffer sized for a block device
+    with open(filename, "rb", buffering=0) as f:
+        data = f.read()
+    for line in data.decode("utf-8").splitlines():
+        line = line.strip()
+        if line:
+            yield line
 
 
 def read_dict(filename, div="="):
@@ -195,10 +274,13 @@ def read_dict(filename, div="="):
     Returns:
         (dict) generated dictionary
     """
+    with open(filename, "rb", buffering=0) as f:
+        data = f.read()
     d = {}
-    with open(filename, "r") as f:
-        for line in f:
-            key, val = line.split(div)
+    for line in data.decode("utf-8").splitlines():
+        # Split at the first divider only, lines without one are skipped
+        key, sep, val = line.partition(div)
+        if sep:
             d[key.strip()] = val.strip()
     return d
 
@@ -215,6 +297,19 @@ def mb_to_bytes(size):
     return size * 1024 * 1024
 
 
+# Cache directories with fewer files than this are stat'ed serially
+_PARALLEL_STAT_THRESHOLD = 64
+_PARALLEL_STAT_WORKERS = 16
+
+
+def _stat_entry(entry):
+    """Stat a directory entry, returning None if it has gone away."""
+    try:
+        return entry.stat()
+    except OSError:
+        return None  # removed while scanning
+
+
 def _get_cache_entries(directory):
     """Get information tuple for all regular files in directory.
 
@@ -224,22 +319,35 @@ def _get_cache_entries(directory):
     Returns:
         (tuple) (modification time, size, filepath)
     """
-    entries = (os.path.join(directory, fn) for fn in os.listdir(directory))
-    entries = ((os.stat(path), path) for path in entries)
-
-    # leave only regular files, insert modification date
-    return (
-        (stat[ST_MTIME], stat[ST_SIZE], path)
-        for stat, path in entries
-        if S_ISREG(stat[ST_MODE])
-    )
-
-
-def _delete_oldest(entries, bytes_needed):
-    """Delete files with oldest modification date until space is freed.
+    # scandir provides the file type without an extra stat call
+    with os.scandir(directory) as it:
+        entries = []
+        for entry in it:
+            try:
+                # leave only regular files
+                if entry.is_file():
+                    entries.append(entry)
+            except OSError:
+                pass  # removed while scanning
+
+    # stat calls release the GIL, overlap them on slow (network) filesystems
+    if len(entries) < _PARALLEL_STAT_THRESHOLD:
+        stats = map(_stat_entry, entries)
+    else:
+        with ThreadPoolExecutor(max_workers=_PARALLEL_STAT_WORKERS) as pool:
+            stats = list(pool.map(_stat_entry, entries))
+
+    # insert modification date
+    for entry, stat in zip(entries, stats):
+        if stat is not None:
+            yield int(stat.st_mtime), stat.st_size, entry.path
+
+
+def _delete_from_heap(heap, bytes_needed):
+    """Delete files in heap order until space is freed.
 
     Args:
-        entries (tuple): file + file stats tuple
+        heap (list): heap of (sort key, file size, file path) tuples
         bytes_needed (int): disk space that needs to be freed
 
     Returns:
@@ -247,21 +355,62 @@ def _delete_oldest(entries, bytes_needed):
     """
     deleted_files = []
     space_freed = 0
-    for moddate, fsize, path in sorted(entries):
+    heapq.heapify(heap)
+    while heap:
+        _, fsize, path = heapq.heappop(heap)
         try:
             os.remove(path)
-            space_freed += fsize
-            deleted_files.append(path)
-        except Exception:
-            pass
+        except OSError:
+            continue  # already gone or not ours to delete
+        space_freed += fsize
+        deleted_files.append(path)
 
-        if space_freed > bytes_needed:
+        if space_freed >= bytes_needed:
             break  # deleted enough!
 
     return deleted_files
 
 
-def curate_cache(directory, min_free_percent=5.0, min_free_disk=50):
+def _delete_oldest(entries, bytes_needed):
+    """Delete files with oldest modification date until space is freed.
+
+    Args:
+        entries (tuple): file + file stats tuple
+        bytes_needed (int): disk space that needs to be freed
+
+    Returns:
+        (list) all removed paths
+    """
+    # Usually only a few files need to go, pop the oldest from a heap
+    # instead of sorting all entries
+    return _delete_from_heap(list(entries), bytes_needed)
+
+
+def _delete_largest_old(entries, bytes_needed):
+    """Delete the files that are both large and old until space is freed.
+
+    Files are scored by age times size, so a large stale file goes before
+    many small recent ones.
+
+    Args:
+        entries (tuple): file + file stats tuple
+        bytes_needed (int): disk space that needs to be freed
+
+    Returns:
+        (list) all removed paths
+    """
+    now = time.time()
+    heap = [
+        (-(now - moddate) * fsize, fsize, path) for moddate, fsize, path in entries
+    ]
+    return _delete_from_heap(heap, bytes_needed)
+
+
+_CURATE_POLICIES = {"oldest": _delete_oldest, "largest_old": _delete_largest_old}
+
+
+def curate_cache(directory, min_free_percent=5.0, min_free_disk=50,
+                 policy="oldest"):
     """Clear out the directory if needed.
 
     The curation will only occur if both the precentage and actual disk space
@@ -274,25 +423,35 @@ def curate_cache(directory, min_free_percent=5.0, min_free_disk=50):
                                   default is 5% if not specified.
         min_free_disk (float): minimum allowed disk space in MB, default
                                value is 50 MB if not specified.
+        policy (str): order files are deleted in, "oldest" (default) deletes
+                      the oldest files first, "largest_old" prefers files
+                      that are both large and old.
     """
+    if policy not in _CURATE_POLICIES:
+        raise ValueError("Unknown cache curation policy: {}".format(policy))
     # Simpleminded implementation -- keep a certain percentage of the
     # disk available.
     # TODO: Would be easy to add more options, like whitelisted files, etc.
-    deleted_files = []
-    space = psutil.disk_usage(directory)
+    # Same figures as psutil.disk_usage(), free space excludes reserved blocks
+    space = os.statvfs(directory)
+    total = space.f_blocks * space.f_frsize
+    free = space.f_bavail * space.f_frsize
+    used = total - space.f_bfree * space.f_frsize
+    percent_free = 100.0 * free / (used + free) if used + free else 0.0
+    if percent_free >= min_free_percent:
+        return []  # the common case, plenty of space left
 
-    min_free_disk = mb_to_bytes(min_free_disk)
-    percent_free = 100.0 - space.percent
-    if percent_free < min_free_percent and space.free < min_free_disk:
+    deleted_files = []
+    if free < mb_to_bytes(min_free_disk):
         LOG.info("Low diskspace detected, cleaning cache")
         # calculate how many bytes we need to delete
-        bytes_needed = (min_free_percent - percent_free) / 100.0 * space.total
+        bytes_needed = (min_free_percent - percent_free) / 100.0 * total
         bytes_needed = int(bytes_needed + 1.0)
 
         # get all entries in the directory w/ stats
         entries = _get_cache_entries(directory)
-        # delete as many as needed starting with the oldest
-        deleted_files = _delete_oldest(entries, bytes_needed)
+        # delete as many as needed in the order of the policy
+        deleted_files = _CURATE_POLICIES[policy](entries, bytes_needed)
 
     return deleted_files
 
@@ -322,6 +481,20 @@ def get_cache_directory(domain=None):
     return ensure_directory_exists(directory, domain)
 
 
+@lru_cache(maxsize=128)
+def _resolve_directory(directory, domain):
+    """Join, expand and normalize a directory path.
+
+    Callers pass the same few paths over and over, so the result is cached.
+    """
+    if domain:
+        directory = os.path.join(directory, domain)
+
+    # Expand and normalize the path
+    directory = os.path.normpath(directory)
+    return os.path.expanduser(directory)
+
+
 def ensure_directory_exists(directory, domain=None, permissions=0o777):
     """Create a directory and give access rights to all
 
@@ -334,17 +507,13 @@ def ensure_directory_exists(directory, domain=None, permissions=0o777):
     Returns:
         (str) a path to the directory
     """
-    if domain:
-        directory = os.path.join(directory, domain)
-
-    # Expand and normalize the path
-    directory = os.path.normpath(directory)
-    directory = os.path.expanduser(directory)
+    directory = _resolve_directory(directory, domain)
 
+    # umask is process wide, only clear it when there is something to create
     if not os.path.isdir(directory):
+        save = os.umask(0)
         try:
-            save = os.umask(0)
-            os.makedirs(directory, permissions)
+            os.makedirs(directory, permissions, exist_ok=True)
         except OSError:
             LOG.warning("Failed to create: " + directory)
         finally:
@@ -360,8 +529,9 @@ def create_file(filename):
         filename: Path to the file to be created
     """
     ensure_directory_exists(os.path.dirname(filename), permissions=0o775)
-    with open(filename, "w") as f:
-        f.write("")
+    # Same as open(filename, "w") without setting up a text stream
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o666)
+    os.close(fd)
 
 
 def get_temp_path(*args):
@@ -250,6 +250,21 @@ class IntentQueryApi:
             return None
         return data["intent"]
 
+    def get_intents(self, utterances, lang="en-us"):
+        """ get best intent for each utterance in a single request """
+        msg = Message("intent.service.intent.batch.get",
+                      {"utterances": utterances, "lang": lang},
+                      context={"destination": "intent_service",
+                               "source": "intent_api"})
+        resp = self.bus.wait_for_response(msg,
+                                          'intent.service.intent.batch.reply',
+                                          timeout=self.timeout)
+        data = resp.data if resp is not None else {}
+        if not data:
+            LOG.error("Intent Service timed out!")
+            return None
+        return data["intents"]
+
     def get_skill(self, utterance, lang="en-us"):
         """ get skill that utterance will trigger """
         intent = self.get_intent(utterance, lang)
@@ -14,6 +14,7 @@ LOG.level parameter.
 import inspect
 import logging
 import sys
+from threading import Lock
 
 import source
 
@@ -40,6 +41,8 @@ class LOG:
     """
 
     _custom_name = None
+    _initialized = False
+    _init_lock = Lock()
     handler = None
     level = logging.getLevelName("INFO")
 
@@ -55,6 +58,8 @@ class LOG:
     def init(cls):
         """Initializes the class, sets the default log level and creates
         the required handlers.
+
+        Called implicitly the first time a logger is created.
         """
         log_message_format = (
             "{asctime} | {levelname:8} | {name} | {message} | {process:5} |"
@@ -64,6 +69,8 @@ class LOG:
         formatter.default_msec_format = "%s.%03d"
         cls.handler = logging.StreamHandler(sys.stdout)
         cls.handler.setFormatter(formatter)
+        # Mark as done before reading the config, which may log itself
+        cls._initialized = True
 
         config = source.configuration.Configuration.get()
         if config.get("log_format"):
@@ -77,6 +84,10 @@ class LOG:
 
     @classmethod
     def create_logger(cls, name):
+        if not cls._initialized:
+            with cls._init_lock:
+                if not cls._initialized:
+                    cls.init()
         logger = logging.getLogger(name)
         logger.propagate = False
         logger.addHandler(cls.handler)
@@ -159,6 +159,7 @@ def start_message_bus_client(service, bus=None, whitelist=None):
     # Local imports to avoid circular importing
     from source.configuration import Configuration
     from source.messagebus.client import MessageBusClient
+    from source.messagebus.send_func import set_client
 
     # Create a client if one was not provided
     if bus is None:
@@ -173,6 +174,7 @@ def start_message_bus_client(service, bus=None, whitelist=None):
     # Wait for connection
     bus_connected.wait()
     LOG.info("Connected to messagebus")
+    set_client(bus)
 
     return bus
 
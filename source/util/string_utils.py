@@ -22,3 +22,77 @@ def camel_case_split(identifier: str) -> str:
     regex = '.+?(?:(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|$)'
     matches = re.finditer(regex, identifier)
     return ' '.join([m.group(0) for m in matches])
+
+
+# A sentence ends on ".", "!" or "?" followed by whitespace, or on a newline
+SENTENCE_END = re.compile(r"[.!?](?=\s)|\n")
+ABBREVIATIONS = ("Dr.", "Mr.", "Mrs.", "Ms.", "Jr.", "Sr.", "St.", "vs.")
+
+
+class SentenceAggregator:
+    """Aggregate streamed text fragments into complete sentences.
+
+    Abbreviations such as "Dr." and decimals don't end a sentence, and
+    sentences shorter than min_length are joined with the following one.
+
+    Args:
+        min_length (int): minimum number of characters in a sentence
+    """
+
+    def __init__(self, min_length=10):
+        self.min_length = min_length
+        self.buffer = ""
+        # Everything before this position has already been scanned
+        self._scan_pos = 0
+
+    def push(self, text):
+        """Add a text fragment to the buffer.
+
+        Args:
+            text (str): fragment of streamed text
+
+        Returns:
+            list: sentences completed by the fragment
+        """
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer, self._scan_pos):
+            sentence = self.buffer[start:match.end()].strip()
+            words = sentence.rsplit(None, 1)
+            if words and words[-1] in ABBREVIATIONS:
+                continue
+            if len(sentence) < self.min_length:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        # The last character is scanned again as punctuation only ends a
+        # sentence once the whitespace following it has arrived.
+        self._scan_pos = max(len(self.buffer) - 1, 0)
+        return sentences
+
+    def flush(self):
+        """Return whatever is left in the buffer and reset it."""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        self._scan_pos = 0
+        return remainder
+
+
+def aggregate_sentences(fragments, min_length=10):
+    """Turn an iterator of text fragments into an iterator of sentences.
+
+    Args:
+        fragments (iterator): streamed text fragments
+        min_length (int): minimum number of characters in a sentence
+
+    Yields:
+        str: complete sentences, followed by any trailing text
+    """
+    aggregator = SentenceAggregator(min_length)
+    for fragment in fragments:
+        yield from aggregator.push(fragment)
+    remainder = aggregator.flush()
+    if remainder:
+        yield remainder
@@ -45,6 +45,40 @@ class TestConfiguration(TestCase):
         source.configuration.Configuration.updated('message')
         self.assertEqual(c, {'a': 2})
 
+    @patch('source.configuration.config.LocalConf')
+    def test_stack_cached_until_modified(self, mock_local):
+        mock_local.return_value = {'a': 1}
+        conf = source.configuration.Configuration
+        conf._load_stack.cache_clear()
+        stat = (('user.conf', 1), ('default.conf', 1))
+        with patch.object(conf, '_stack_stat', return_value=stat):
+            self.assertEqual(conf.load_config_stack(), {'a': 1})
+            self.assertEqual(conf.load_config_stack(), {'a': 1})
+            self.assertEqual(mock_local.call_count, 2)
+
+        # A modified file invalidates the cached stack
+        stat = (('user.conf', 2), ('default.conf', 1))
+        with patch.object(conf, '_stack_stat', return_value=stat):
+            conf.load_config_stack()
+            self.assertEqual(mock_local.call_count, 4)
+            # as does a configuration.updated message
+            conf.updated('message')
+            self.assertEqual(mock_local.call_count, 6)
+        conf._load_stack.cache_clear()
+
+    @patch('source.configuration.config.LocalConf')
+    def test_cached_stack_not_shared(self, mock_local):
+        mock_local.return_value = {'a': 1, 'b': {'c': 1}}
+        conf = source.configuration.Configuration
+        conf._load_stack.cache_clear()
+        stat = (('user.conf', 1), ('default.conf', 1))
+        with patch.object(conf, '_stack_stat', return_value=stat):
+            config = conf.get()
+            config['a'] = 2
+            config['b']['c'] = 2
+            self.assertEqual(conf.get(), {'a': 1, 'b': {'c': 1}})
+        conf._load_stack.cache_clear()
+
     def tearDown(self):
         source.configuration.Configuration.load_config_stack([{}], True)
 
@@ -0,0 +1,38 @@
+import socket
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from source.messagebus import send_func
+from source.messagebus.load_config import MessageBusConfig
+
+
+def unused_port():
+    """Get a local port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestSend(TestCase):
+    def setUp(self):
+        send_func._bus_url.cache_clear()
+        self.addCleanup(send_func._bus_url.cache_clear)
+
+    @patch('source.messagebus.send_func.load_message_bus_config')
+    @patch('source.messagebus.send_func._client', None)
+    def test_unreachable_bus(self, mock_config):
+        """Check that send fails right away when the bus is down."""
+        mock_config.return_value = MessageBusConfig(
+            '127.0.0.1', unused_port(), '/core', False)
+        with self.assertRaises(ConnectionRefusedError):
+            send_func.send('speak', {'utterance': 'hello'})
+
+    @patch('source.messagebus.send_func.create_connection')
+    def test_registered_client(self, mock_create_connection):
+        bus = Mock()
+        with patch('source.messagebus.send_func._client', bus):
+            send_func.send('speak', {'utterance': 'hello'})
+        message = bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, 'speak')
+        self.assertEqual(message.data, {'utterance': 'hello'})
+        mock_create_connection.assert_not_called()
@@ -18,7 +18,8 @@ from unittest import TestCase, mock
 from adapt.intent import IntentBuilder
 
 from source.configuration import Configuration
-from source.intent_services import IntentService, _get_message_lang
+from source.intent_services import (IntentService, _default_lang,
+                                    _get_message_lang)
 from source.intent_services.adapt_service import AdaptIntent, ContextManager
 from source.messagebus import Message
 
@@ -118,7 +119,7 @@ class ConversationTest(TestCase):
         self.intent_service.add_active_skill(result.skill_id)
         # Check that the active skill list was updated to set the responding
         # Skill first.
-        first_active_skill = self.intent_service.active_skills[0][0]
+        first_active_skill = next(iter(self.intent_service.active_skills))
         self.assertEqual(first_active_skill, 'atari_skill')
 
         # Check that a skill responded that it could handle the message
@@ -163,6 +164,22 @@ class ConversationTest(TestCase):
         self.assertEqual(sent_skill_ids,
                          ['amiga_skill', 'c64_skill', 'atari_skill'])
 
+    def test_converse_stale_response(self):
+        """Check that a late reply from another skill is skipped."""
+        stale = Message('skill.converse.response', {'skill_id': 'c64_skill',
+                                                    'result': False})
+        atari = Message('skill.converse.response', {'skill_id': 'atari_skill',
+                                                    'result': True})
+        self.intent_service.bus.wait_for_response.return_value = stale
+        self.intent_service.bus.wait_for_message.return_value = atari
+
+        utterance_msg = Message('recognizer_loop:utterance',
+                                data={'lang': 'en-US',
+                                      'utterances': ['hello old friend']})
+        self.assertTrue(self.intent_service.do_converse(
+            ['hello old friend'], 'atari_skill', 'en-US', utterance_msg))
+        self.intent_service.bus.wait_for_message.assert_called_once()
+
     def test_reset_converse(self):
         """Check that a blank stt sends the reset signal to the skills."""
         def response(message, return_msg_type):
@@ -186,11 +203,16 @@ class ConversationTest(TestCase):
         self.assertTrue(check_converse_request(c64_message, 'c64_skill'))
         atari_message = wait_for_response_mock.call_args_list[1][0][0]
         self.assertTrue(check_converse_request(atari_message, 'atari_skill'))
-        first_active_skill = self.intent_service.active_skills[0][0]
+        first_active_skill = next(iter(self.intent_service.active_skills))
         self.assertEqual(first_active_skill, 'atari_skill')
 
 
 class TestLanguageExtraction(TestCase):
+    def setUp(self):
+        # The default language is cached between utterances
+        _default_lang.cache_clear()
+        self.addCleanup(_default_lang.cache_clear)
+
     @mock.patch.dict(Configuration._Configuration__config, BASE_CONF)
     def test_no_lang_in_message(self):
         """No lang in message should result in lang from config."""
@@ -294,6 +316,18 @@ class TestIntentServiceApi(TestCase):
         reply = get_last_message(self.intent_service.bus)
         self.assertEqual(reply.data['intent'], None)
 
+    def test_get_intent_batch(self):
+        """Check that all utterances are answered in a single reply."""
+        self.setup_simple_adapt_intent()
+        msg = Message('intent.service.intent.batch.get',
+                      data={'utterances': ['test', 'five']})
+        self.intent_service.handle_get_intent_batch(msg)
+        reply = get_last_message(self.intent_service.bus)
+        intents = reply.data['intents']
+        self.assertEqual(len(intents), 2)
+        self.assertEqual(intents[0]['intent_type'], 'skill:testIntent')
+        self.assertEqual(intents[1], None)
+
     def test_get_intent_manifest(self):
         """Check that if the intent doesn't match at all None is returned."""
         self.setup_simple_adapt_intent()
@@ -17,7 +17,8 @@ from unittest import TestCase
 from unittest.mock import Mock, patch
 
 from source.core.skill_loader import SkillLoader
-from source.core.skill_manager import SkillManager, UploadQueue
+from source.core.skill_manager import (SkillDirectoryEventHandler,
+                                       SkillManager, UploadQueue)
 
 from ..base import CoreUnitTestBase
 from ..mocks import mock_msm
@@ -60,6 +61,57 @@ class TestUploadQueue(TestCase):
             l.instance.settings_meta.upload.assert_called_once_with()
 
 
+class TestSkillDirectoryEventHandler(TestCase):
+    def setUp(self):
+        self.stale = Mock()
+        self.handler = SkillDirectoryEventHandler('/opt/skills/',
+                                                  self.stale)
+
+    def _event(self, event_type, src_path, dest_path='', is_directory=False):
+        return Mock(event_type=event_type, src_path=src_path,
+                    dest_path=dest_path, is_directory=is_directory)
+
+    def test_skill_added_or_removed(self):
+        for event in (self._event('created', '/opt/skills/foo'),
+                      self._event('deleted', '/opt/skills/foo/__init__.py'),
+                      self._event('moved', '/tmp/foo', '/opt/skills/foo')):
+            self.stale.reset_mock()
+            self.handler.on_any_event(event)
+            self.stale.set.assert_called_once_with()
+
+    def test_unrelated_changes_ignored(self):
+        for event in (self._event('modified', '/opt/skills/foo/__init__.py'),
+                      self._event('created', '/opt/skills/foo/bar.py'),
+                      self._event('created', '/opt/skills/foo/a/__init__.py')):
+            self.handler.on_any_event(event)
+        self.stale.set.assert_not_called()
+
+    def test_skill_file_changed(self):
+        changed = Mock()
+        handler = SkillDirectoryEventHandler('/opt/skills/', self.stale,
+                                             changed)
+        handler.on_any_event(self._event('modified', '/opt/skills/foo/a.py'))
+        handler.on_any_event(self._event('moved', '/opt/skills/bar/b.py',
+                                         '/opt/skills/bar/c.py'))
+        self.assertEqual(changed.call_args_list,
+                         [(('/opt/skills/foo',),), (('/opt/skills/bar',),)])
+
+    def test_ignored_skill_file_changes(self):
+        changed = Mock()
+        handler = SkillDirectoryEventHandler('/opt/skills/', self.stale,
+                                             changed)
+        for event in (
+                self._event('modified', '/opt/skills/foo/settings.json'),
+                self._event('modified', '/opt/skills/foo/a.pyc'),
+                self._event('created', '/opt/skills/foo/.git/HEAD'),
+                self._event('modified', '/opt/skills/foo/ui',
+                            is_directory=True),
+                self._event('closed', '/opt/skills/foo/a.py'),
+                self._event('modified', '/opt/skills/a.py')):
+            handler.on_any_event(event)
+        changed.assert_not_called()
+
+
 class TestSkillManager(CoreUnitTestBase):
     mock_package = 'core.skills.skill_manager.'
     use_msm_mock = True
@@ -106,6 +158,9 @@ class TestSkillManager(CoreUnitTestBase):
         self.skill_manager.skill_loaders = {
             str(self.skill_dir): self.skill_loader_mock
         }
+        self.skill_manager._loaders_by_id = {
+            'test_skill': self.skill_loader_mock
+        }
 
     def test_instantiate(self):
         self.assertEqual(
@@ -317,6 +372,11 @@ class TestSkillManager(CoreUnitTestBase):
         self.skill_manager.skill_loaders['foo'] = foo_skill_loader
         self.skill_manager.skill_loaders['foo2'] = foo2_skill_loader
         self.skill_manager.skill_loaders['test_skill'] = test_skill_loader
+        self.skill_manager._loaders_by_id = {
+            'foo': foo_skill_loader,
+            'foo2': foo2_skill_loader,
+            'test_skill': test_skill_loader
+        }
 
         self.skill_manager.deactivate_except(message)
         foo_skill_loader.deactivate.assert_called_once_with()
@@ -332,6 +392,7 @@ class TestSkillManager(CoreUnitTestBase):
 
         self.skill_manager.skill_loaders = {}
         self.skill_manager.skill_loaders['test_skill'] = test_skill_loader
+        self.skill_manager._loaders_by_id = {'test_skill': test_skill_loader}
 
         self.skill_manager.activate_skill(message)
         test_skill_loader.activate.assert_called_once_with()
@@ -20,6 +20,8 @@ class MsgTypeCheck:
 
 
 class MockTTS(source.tts.TTS):
+    compute_visemes = True
+
     def __init__(self, lang, config, validator, audio_ext='wav',
                  phonetic_spelling=True, ssml_tags=None):
         super().__init__(lang, config, validator, audio_ext)
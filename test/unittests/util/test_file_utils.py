@@ -1,6 +1,6 @@
 import shutil
 import tempfile
-from os import makedirs
+from os import makedirs, utime
 from os.path import abspath, dirname, exists, expanduser, isdir, join, normpath
 from unittest import TestCase, mock
 
@@ -176,6 +176,46 @@ class TestCache(TestCase):
         self.assertFalse(exists(huxley_path))
 
 
+TEST_CURATE_POLICY_DIR = join(tempfile.gettempdir(), 'curate_policy_test')
+
+
+class TestCurateCachePolicy(TestCase):
+    def setUp(self):
+        self.cache_dir = TEST_CURATE_POLICY_DIR
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        makedirs(self.cache_dir, exist_ok=True)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    @mock.patch('source.util.file_utils.os.statvfs')
+    def test_largest_old_policy(self, mock_statvfs):
+        """Check that a large old file is removed before small new ones."""
+        space = mock.Mock(name='diskspace')
+        mock_statvfs.return_value = space
+        space.f_frsize = 1
+        space.f_blocks = 50000  # 4% free, 500 bytes need to be freed
+        space.f_bfree = space.f_bavail = 2000
+
+        big_path = join(self.cache_dir, 'big.txt')
+        with open(big_path, 'w') as f:
+            f.write('x' * 1000)
+        utime(big_path, (1000, 1000))
+        small_paths = []
+        for name in ('small1.txt', 'small2.txt'):
+            path = join(self.cache_dir, name)
+            with open(path, 'w') as f:
+                f.write('x')
+            utime(path, (500, 500))
+            small_paths.append(path)
+
+        self.assertEqual(curate_cache(self.cache_dir, policy='largest_old'),
+                         [big_path])
+        self.assertTrue(all(exists(path) for path in small_paths))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            curate_cache(self.cache_dir, policy='random')
+
+
 TEST_CREATE_FILE_DIR = join(tempfile.gettempdir(), 'create_file_test')
 
 
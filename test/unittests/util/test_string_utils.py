@@ -1,6 +1,7 @@
 from unittest import TestCase
 
 from source.util import camel_case_split
+from source.util.string_utils import SentenceAggregator, aggregate_sentences
 
 
 class TestStringFunctions(TestCase):
@@ -8,3 +9,36 @@ class TestStringFunctions(TestCase):
         """Check that camel case string is split properly."""
         self.assertEqual(camel_case_split('MyCoolSkill'), 'My Cool Skill')
         self.assertEqual(camel_case_split('MyCOOLSkill'), 'My COOL Skill')
+
+
+class TestSentenceAggregator(TestCase):
+    def test_split_streamed_fragments(self):
+        aggregator = SentenceAggregator()
+        self.assertEqual(aggregator.push('Hello there, sir'), [])
+        self.assertEqual(aggregator.push('. How are'), ['Hello there, sir.'])
+        self.assertEqual(aggregator.push(' you today? I'),
+                         ['How are you today?'])
+        self.assertEqual(aggregator.flush(), 'I')
+
+    def test_punctuation_at_fragment_end(self):
+        aggregator = SentenceAggregator()
+        self.assertEqual(aggregator.push('It is done, sir.'), [])
+        self.assertEqual(aggregator.push('\nAnything'), ['It is done, sir.'])
+        self.assertEqual(aggregator.push(' else, Mr.'), [])
+        self.assertEqual(aggregator.push(' Smith? '),
+                         ['Anything else, Mr. Smith?'])
+
+    def test_abbreviations_and_decimals(self):
+        aggregator = SentenceAggregator()
+        sentences = aggregator.push('Ask Dr. Smith about pi, it is 3.14 or so. ')
+        self.assertEqual(sentences, ['Ask Dr. Smith about pi, it is 3.14 or so.'])
+
+    def test_short_sentences_are_joined(self):
+        aggregator = SentenceAggregator()
+        self.assertEqual(aggregator.push('Yes. I can do that. '),
+                         ['Yes. I can do that.'])
+
+    def test_aggregate_sentences(self):
+        fragments = ['The weather is', ' fine today. Enjoy', ' it']
+        self.assertEqual(list(aggregate_sentences(fragments)),
+                         ['The weather is fine today.', 'Enjoy it'])